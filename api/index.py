@@ -1,13 +1,11 @@
 
-import string
-import random
 import os
 import sys
 
-# Add the parent directory to sys.path so we can import app.py
-current_dir = os.path.dirname(os.path.abspath(__file__))
-parent_dir = os.path.dirname(current_dir)
-sys.path.append(parent_dir)
+# Make the repo root importable from this file's own location, whatever the working directory
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
 
 from app import server as app
 
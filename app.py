@@ -3,20 +3,90 @@ from dash import dcc, html, dash_table, no_update, callback_context, ClientsideF
 import dash_bootstrap_components as dbc
 from dash.dependencies import Input, Output, State, ALL
 import plotly.graph_objects as go
+import plotly.io as pio
 from dotenv import load_dotenv
 import pandas as pd
+import numpy as np
 import json
 import re
 import urllib.parse
 from datetime import datetime
 import threading
+import queue
+import logging
 import hashlib
+import functools
+from types import MappingProxyType
+from collections import OrderedDict, namedtuple
+import gzip
+import base64
 
 
 
 import flask
 import os
-from who_standards import calculate_bmi_z_score, classify_who_z_score
+import sys
+from who_standards import calculate_bmi_z_score_vec, classify_who_z_score_vec
+
+try:
+    import brotli  # optional: smaller CSS/JS than gzip when installed
+except ImportError:
+    brotli = None
+
+try:
+    import orjson  # optional: much faster JSON for callback payloads and the Sheets sync
+except ImportError:
+    orjson = None
+
+try:
+    import ijson  # optional: streams the boundary GeoJSON feature by feature
+except ImportError:
+    ijson = None
+
+try:
+    import pyarrow  # optional: ships the data snapshot to the browser as compact Parquet
+except ImportError:
+    pyarrow = None
+
+# Per-callback trace output for the dashboard hot path; set DASHBOARD_LOG_LEVEL=DEBUG to see it.
+# At the default WARNING level the debug calls return before formatting anything.
+logger = logging.getLogger(__name__)
+logger.setLevel(os.environ.get("DASHBOARD_LOG_LEVEL", "WARNING").upper())
+if not logger.handlers:
+    logger.addHandler(logging.StreamHandler(sys.stdout))
+    logger.propagate = False
+
+# Dash serializes every callback response through plotly's JSON engine
+if orjson is not None:
+    pio.json.config.default_engine = "orjson"
+
+def _orjson_default(obj):
+    # Components and figures describe themselves; numpy/pandas leftovers become plain values
+    if hasattr(obj, "to_plotly_json"):
+        return obj.to_plotly_json()
+    if isinstance(obj, (np.ndarray, pd.Series, pd.Index)):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    raise TypeError
+
+def to_json_fast(value):
+    """
+    Encodes a Dash response with orjson in one native pass.
+    plotly's engine first walks the whole object in Python to make it JSON-safe, which is most
+    of its cost on figure-heavy responses; anything orjson can't take still goes through it.
+    """
+    try:
+        return orjson.dumps(value, default=_orjson_default,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    except TypeError:
+        return pio.json.to_json_plotly(value)
+
+if orjson is not None:
+    # Callback responses are encoded through dash._callback's own reference to to_json
+    dash._callback.to_json = to_json_fast
 
 # =========================
 # GLOBAL CONSTANTS
@@ -29,6 +99,11 @@ BENEFICIARY_MAP = {
     6: "Adolescent Boys 10-19 Years",
     7: "Women Of Reproductive Age"
 }
+# Display labels as shown in the table (title-cased once here rather than per load)
+BENEFICIARY_MAP_TITLE = {k: str(v).title() for k, v in BENEFICIARY_MAP.items()}
+# Free-text name columns title-cased once at load (never per callback: that also hit the
+# WhatsApp markdown links and the masked PII)
+TITLE_COLS = ("Name", "Asha_Worker")
 BLOCK_CODE_MAP = {
     "2": "Yelburga",
     "3": "Kushtagi",
@@ -36,7 +111,71 @@ BLOCK_CODE_MAP = {
     "5": "Koppal"
 }
 
-anemia_list = ["normal", "mild", "moderate", "severe"]
+# Sheet-side anemia labels normalised to the dashboard's lowercase categories
+ANEMIA_LABEL_MAP = {"Normal": "normal", "Mild anemia": "mild", "Moderate anemia": "moderate", "Severe anemia": "severe"}
+
+# District outline drawn on both maps
+BOUNDARY_GEOJSON_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "koppal_district_official.geojson")
+BOUNDARY_DISTRICT = "Koppal"
+
+# PSU village centroids used by both maps; read-only so it can be shared across requests
+AREA_COORDINATES = MappingProxyType({
+    'Kunikera': {'lat': 15.2832, 'lon': 76.2142},
+    'Ojanahalli': {'lat': 15.3856, 'lon': 76.1472},
+    'Bannikoppa': {'lat': 15.3877, 'lon': 75.9420},
+    'Tadkal': {'lat': 15.3688, 'lon': 75.9812},
+    'Hulegudda': {'lat': 15.6235, 'lon': 76.1146},
+    'Konasagara': {'lat': 15.6916, 'lon': 76.1030},
+    'Kawalbodur': {'lat': 15.8318, 'lon': 76.1871},
+    'Balutagi': {'lat': 15.87338865573784, 'lon': 76.25665534853232},
+    'HireGonnagar': {'lat': 15.8092, 'lon': 75.9539},
+    'Anegundi': {'lat': 15.3507, 'lon': 76.4925},
+    'Kilarhatti': {'lat': 15.8411, 'lon': 76.4359},
+    'Challur': {'lat': 15.6014, 'lon': 76.5943},
+    'Marlanahalli': {'lat': 15.5771, 'lon': 76.6490},
+    'Gouripur': {'lat': 15.6187547, 'lon': 76.35504569999999},
+    'Hatti': {'lat': 15.2117, 'lon': 75.9350},
+    'Komlapur': {'lat': 15.3405, 'lon':76.0215},
+    'Chikwankal Kunta': {'lat': 15.629761351168723, 'lon':76.23304865792784},
+    'Hire Wankal Kunta': {'lat': 15.646960083050104, 'lon':76.238318366376871},
+    'Talkere': {'lat': 15.645466597713694, 'lon': 76.26477078258641},
+    'Ningalbandi': {'lat': 15.671063605028287, 'lon': 76.13794513593994},
+    'Badimnhal': {'lat': 15.839823262484467, 'lon': 75.95503149946924},
+    'Venkatapur': {'lat': 15.858511392991407, 'lon': 75.97308023163832},
+    'Garjanhal': {'lat': 15.833697603912572, 'lon': 76.41468762354576},
+    'Teggihal': {'lat': 15.849556310249351, 'lon': 76.27912911541603},
+    'Mallapur': {'lat': 15.3933, 'lon': 76.4867},
+    'Rampura': {'lat': 15.3822, 'lon': 76.4816},
+    'Hagedal': {'lat': 15.590418925207551,  'lon':76.59839346965396},
+    'Basrihal': {'lat': 15.595505073968516, 'lon':76.38104641401482},
+    'Chikka Madinal': {'lat': 15.523496092485985, 'lon': 76.3778821765826},
+    'Wadganhal': {'lat': 15.349168758650613, 'lon': 76.0804548913306},
+    'Hirebommanahal': {'lat': 15.597423828789088 , 'lon': 76.2735258247831},
+    'Hiresulikeri': {'lat': 15.52797030965004,'lon':  76.26075289964011 },
+    'Jinnapur': {'lat': 15.490613192523476,'lon':  76.25717388261322},
+    'Belgatti': {'lat': 15.213735760897155, 'lon': 75.9243389399449 },
+    'Kawaloor': {'lat': 15.296976608396339, 'lon': 75.93461733961688},
+    'Kesoor': {'lat': 15.872788521335098, 'lon': 76.19874347785046 },
+    'Gangawati (CMC+OG) WARD No- 0005': {'lat': 15.424340577107621, 'lon': 76.53100417165172},
+    'Gangawati (CMC+OG) WARD No- 0009': {'lat': 15.4280, 'lon': 76.5250},
+    'Gangawati (CMC+OG) WARD No- 0015': {'lat': 15.4330, 'lon': 76.5350},
+    'Koppal (CMC) WARD No-0008': {'lat': 15.3530, 'lon': 76.1580},
+    'Koppal (CMC) WARD No-0021': {'lat': 15.3480, 'lon': 76.1520},
+    'Koppal (CMC) WARD No-0001': {'lat': 15.3550, 'lon': 76.1500}
+})
+# The same table as parallel columns (names / lat / lon). The Series are name-indexed so
+# PSU -> coordinate binding is a hash join, not a per-row lambda
+PSU_NAMES = list(AREA_COORDINATES)
+PSU_LAT = pd.Series([AREA_COORDINATES[name]["lat"] for name in PSU_NAMES], index=PSU_NAMES, dtype=float)
+PSU_LON = pd.Series([AREA_COORDINATES[name]["lon"] for name in PSU_NAMES], index=PSU_NAMES, dtype=float)
+
+# Precompiled patterns (parse_age runs once per row on every load)
+_RE_DATE_LIKE = re.compile(r'\d{1,4}[-/]\d{1,2}[-/]\d{1,4}')
+_RE_YEARS = re.compile(r'(\d+(?:\.\d+)?)\s*(?:y|yr|year)')
+_RE_MONTHS = re.compile(r'(\d+(?:\.\d+)?)\s*(?:m|mo|month)')
+_RE_NUMS = re.compile(r'\d+(?:\.\d+)?')
+_RE_NON_DIGIT = re.compile(r'\D')
+_RE_ANY_CHAR = re.compile(r'.', re.DOTALL)
 
 # =========================
 # PII ANONYMIZATION (DPDP)
@@ -51,6 +190,15 @@ def salt_hash_pii(val, prefix=""):
     hash_obj = hashlib.sha256((clean_val + PII_SALT).encode())
     return f"{prefix}{hash_obj.hexdigest()[:8].upper()}"
 
+def fast_series_fingerprint(s):
+    """
+    Non-cryptographic per-cell uint64 fingerprints (pandas' vectorized hash) for change
+    detection and dedup keys. NOT a substitute for salt_hash_pii on DPDP-protected columns.
+    The column name and dtype seed the hash so equal values in different columns don't collide.
+    """
+    hash_key = hashlib.md5(f"{s.name}|{s.dtype}".encode()).hexdigest()[:16]
+    return pd.util.hash_pandas_object(s, index=False, categorize=True, hash_key=hash_key).to_numpy()
+
 def mask_pii_readable(val):
     """Masks string to show first and last letter (e.g. Ashwin -> A****n)"""
     if val is None or pd.isna(val) or str(val).strip() == "":
@@ -69,6 +217,54 @@ def mask_contact(val):
         return f"{s[:2]}{'X' * (len(s)-4)}{s[-2:]}"
     return "****"
 
+def _strip_present(s):
+    """Stripped string view of a column plus one boolean mask of its non-null, non-blank cells."""
+    stripped = s.astype("string").str.strip().fillna("")
+    return stripped, stripped.ne("").to_numpy(dtype=bool)
+
+def title_case_series(s):
+    """s.astype(str).str.title(), evaluated once per distinct value (masked names repeat heavily)."""
+    text = s.astype(str)
+    codes, uniques = pd.factorize(text)
+    # Trailing slot catches the -1 null sentinel
+    titled = np.append(pd.Series(uniques, dtype=object).str.title().to_numpy(dtype=object), None)
+    return pd.Series(titled[codes], index=s.index).astype(text.dtype)
+
+def _mask_distinct(vals, mask_fn):
+    """Runs mask_fn once per distinct value (staff names repeat across many rows) and scatters back."""
+    codes, uniques = pd.factorize(vals)
+    return mask_fn(pd.Series(uniques, dtype="string")).to_numpy(dtype=object)[codes]
+
+def _mask_readable_strings(vals):
+    masked = vals.str.slice(0, 1) + "****" + vals.str.slice(-1)
+    return masked.where(vals.str.len() > 2, vals)
+
+def _mask_contact_strings(vals):
+    lens = vals.str.len()
+    fill = pd.Series("X", index=vals.index, dtype="string").str.repeat((lens - 4).clip(lower=0).tolist())
+    return (vals.str.slice(0, 2) + fill + vals.str.slice(-2)).where(lens >= 4, "****")
+
+def mask_pii_readable_series(s):
+    """Column-wide mask_pii_readable using .str slicing instead of a per-cell apply."""
+    out = pd.Series("", index=s.index, dtype=object)
+    # All-null columns (common in test pulls) skip the string conversion entirely
+    if not s.notna().any():
+        return out
+    stripped, present = _strip_present(s)
+    if present.any():
+        out[present] = _mask_distinct(stripped[present], _mask_readable_strings)
+    return out
+
+def mask_contact_series(s):
+    """Column-wide mask_contact using .str slicing instead of a per-cell apply."""
+    out = pd.Series("", index=s.index, dtype=object)
+    if not s.notna().any():
+        return out
+    stripped, present = _strip_present(s)
+    if present.any():
+        out[present] = _mask_distinct(stripped[present], _mask_contact_strings)
+    return out
+
 # ========================
 # DASH INIT
 # =========================
@@ -83,12 +279,54 @@ app.scripts.config.serve_locally = True
 app.css.config.serve_locally = True
 server = app.server
 
+_ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+_ALLOWED_ASSETS = frozenset({'images.png', 'main_logo.svg', 'government-of-karnataka.jpg'})
+_ASSET_MAX_AGE = 31536000  # 1 year; logos only change with a redeploy
+
 @server.route('/<filename>')
 def serve_assets(filename):
-    if filename in ['images.png', 'main_logo.svg', 'government-of-karnataka.jpg']:
-        root_dir = os.path.dirname(os.path.abspath(__file__))
-        return flask.send_from_directory(root_dir, filename)
-    return flask.abort(404)
+    if filename not in _ALLOWED_ASSETS:
+        return flask.abort(404)
+    resp = flask.send_from_directory(_ASSET_DIR, filename, max_age=_ASSET_MAX_AGE)
+    resp.headers["Cache-Control"] = f"public, max-age={_ASSET_MAX_AGE}, immutable"
+    return resp
+
+def _precompress_assets():
+    """Compresses every assets/*.css and *.js once at import, keyed by its served URL."""
+    compressed = {}
+    for root, _, files in os.walk(_ASSET_DIR):
+        for name in files:
+            if not name.endswith((".css", ".js")):
+                continue
+            path = os.path.join(root, name)
+            with open(path, "rb") as f:
+                data = f.read()
+            variants = {"gzip": gzip.compress(data, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                variants["br"] = brotli.compress(data, quality=11)
+            rel_path = os.path.relpath(path, _ASSET_DIR).replace(os.sep, "/")
+            compressed[app.get_asset_url(rel_path)] = variants
+    return compressed
+
+_COMPRESSED_ASSETS = _precompress_assets()
+
+@server.after_request
+def serve_precompressed_assets(resp):
+    variants = _COMPRESSED_ASSETS.get(flask.request.path)
+    if not variants or resp.status_code != 200 or "Content-Encoding" in resp.headers:
+        return resp
+    # Dash fingerprints asset URLs with ?m=<mtime>, so those can be cached for good
+    if "m" in flask.request.args:
+        resp.headers["Cache-Control"] = f"public, max-age={_ASSET_MAX_AGE}, immutable"
+    accepted = flask.request.headers.get("Accept-Encoding", "")
+    for encoding in ("br", "gzip"):
+        if encoding in variants and encoding in accepted:
+            resp.direct_passthrough = False
+            resp.set_data(variants[encoding])
+            resp.headers["Content-Encoding"] = encoding
+            resp.headers["Vary"] = "Accept-Encoding"
+            break
+    return resp
 
 # Styles are now loaded from assets/style_v3.css automatically
 
@@ -114,13 +352,51 @@ def load_sync_cache():
     else:
         LAST_SYNC_CACHE = {}
 
+def write_json_atomic(path, obj):
+    """Serializes in memory, then writes once to a temp file and swaps it in (no torn cache files)."""
+    if orjson is not None:
+        data = orjson.dumps(obj)
+    else:
+        data = json.dumps(obj, separators=(",", ":")).encode("utf-8")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
 def save_sync_cache():
     try:
-        with open(CACHE_FILE, "w") as f:
-            json.dump(LAST_SYNC_CACHE, f)
+        write_json_atomic(CACHE_FILE, LAST_SYNC_CACHE)
     except Exception as e:
         print(f"DEBUG: Failed to save sync cache: {e}")
 
+# Sheets sync transport: one pooled session, payload sent in fixed-size batches
+SYNC_BATCH_SIZE = 200
+_SYNC_SESSION = None
+# Send batches as base64(gzip(JSON)); needs the code.js doPost that understands application/x-gzip
+SYNC_GZIP = os.environ.get("SYNC_GZIP", "0") == "1"
+
+def get_sync_session():
+    global _SYNC_SESSION
+    if _SYNC_SESSION is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        session = requests.Session()
+        # Retry only failures where Apps Script never ran the batch: connect errors and 429.
+        # doPost updates known IDs in place but appends new ones, and a 5xx or read timeout may
+        # come back while the first attempt is still running; a retry racing it would append the
+        # new IDs twice. Exhausted retries return the last response, so the batch loop logs it
+        # and moves on instead of a RetryError aborting the remaining batches.
+        retry = Retry(total=3, connect=3, read=0, other=0, backoff_factor=0.5, status_forcelist=[429],
+                      allowed_methods=None, raise_on_status=False)
+        session.mount("https://", HTTPAdapter(max_retries=retry))
+        _SYNC_SESSION = session
+    return _SYNC_SESSION
+
+def row_signature(values):
+    """Fixed-size (16-byte, hex) digest of a row's sync values, stored per ID in the sync cache."""
+    return hashlib.blake2b("\x1f".join(values).encode("utf-8"), digest_size=16).hexdigest()
+
 # Initial load
 load_sync_cache()
 
@@ -142,14 +418,94 @@ def load_notified_cache():
 
 def save_notified_cache():
     try:
-        with open(NOTIFIED_FILE, "w") as f:
-            json.dump(NOTIFIED_CACHE, f)
+        write_json_atomic(NOTIFIED_FILE, NOTIFIED_CACHE)
     except Exception as e:
         print(f"DEBUG: Failed to save notified cache: {e}")
 
 # Initial load for notifications
 load_notified_cache()
 
+# Processed-data snapshots (post-anonymization), keyed by a hash of the raw response body
+# plus the processing version (see snapshot_key)
+DATA_CACHE_DIR = "cache"
+DATA_CACHE_KEEP = 3
+_DATA_CACHE_LOCK = threading.Lock()
+# Version of the pipeline that turns a response into the processed frame: a hash of the code
+# that builds it, so snapshots written by an older deploy (other masking, classification,
+# columns or dtypes) are never served after cache/ survives a restart
+def _processing_version():
+    hasher = hashlib.sha256()
+    for name in ("app.py", "who_standards.py"):
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), name), "rb") as f:
+            hasher.update(f.read())
+    return hasher.hexdigest()[:8]
+
+PROCESSING_VERSION = _processing_version()
+# Latest (snapshot key, df) pair. Only ever replaced wholesale, never mutated, so
+# readers can grab it without the lock; treat the published frame as read-only.
+_FRAME_REF = [None]
+
+def snapshot_key(content_hash):
+    """Cache key of the processed frame for a raw response body hash under this build's pipeline."""
+    return f"{content_hash}-{PROCESSING_VERSION}"
+
+def load_cached_frame(snapshot):
+    path = os.path.join(DATA_CACHE_DIR, f"{snapshot}.parquet")
+    if not os.path.exists(path):
+        return None
+    try:
+        return pd.read_parquet(path)
+    except Exception as e:
+        print(f"DEBUG: Failed to load data cache: {e}")
+        return None
+
+def save_cached_frame(snapshot, df):
+    try:
+        os.makedirs(DATA_CACHE_DIR, exist_ok=True)
+        path = os.path.join(DATA_CACHE_DIR, f"{snapshot}.parquet")
+        tmp_path = f"{path}.tmp"
+        df.to_parquet(tmp_path, compression="zstd")
+        os.replace(tmp_path, path)
+        prune_cached_frames()
+    except Exception as e:
+        print(f"DEBUG: Failed to save data cache: {e}")
+
+def prune_cached_frames(keep=DATA_CACHE_KEEP):
+    """Every upstream edit adds a snapshot; keep only the most recent few."""
+    snapshots = [
+        os.path.join(DATA_CACHE_DIR, name)
+        for name in os.listdir(DATA_CACHE_DIR) if name.endswith(".parquet")
+    ]
+    snapshots.sort(key=os.path.getmtime, reverse=True)
+    for path in snapshots[keep:]:
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f"DEBUG: Failed to prune data cache: {e}")
+
+# Upstream validators (ETag / Last-Modified) for conditional GETs, plus the hash of the body they describe
+SOURCE_META_FILE = os.path.join(DATA_CACHE_DIR, "source_meta.json")
+SOURCE_META = {}
+
+def load_source_meta():
+    global SOURCE_META
+    if os.path.exists(SOURCE_META_FILE):
+        try:
+            with open(SOURCE_META_FILE, "r") as f:
+                SOURCE_META = json.load(f)
+        except Exception as e:
+            print(f"DEBUG: Failed to load source meta: {e}")
+            SOURCE_META = {}
+
+def save_source_meta():
+    try:
+        os.makedirs(DATA_CACHE_DIR, exist_ok=True)
+        write_json_atomic(SOURCE_META_FILE, SOURCE_META)
+    except Exception as e:
+        print(f"DEBUG: Failed to save source meta: {e}")
+
+load_source_meta()
+
 # BENEFICIARY_MAP moved to GLOBAL CONSTANTS at top of file
 
 def parse_age(age_val):
@@ -176,15 +532,15 @@ def parse_age(age_val):
         pass
 
     # 2. Rule out strings that look like full dates (e.g., "2021-06-01" or "21/06/19")
-    if re.search(r'\d{1,4}[-/]\d{1,2}[-/]\d{1,4}', age_str):
+    if _RE_DATE_LIKE.search(age_str):
         return None
 
     years = 0.0
     months = 0.0
     
     # 3. Explicit search for suffixes (Highest priority)
-    y_match = re.search(r'(\d+(\.\d+)?)\s*(y|yr|year)', age_str)
-    m_match = re.search(r'(\d+(\.\d+)?)\s*(m|mo|month)', age_str)
+    y_match = _RE_YEARS.search(age_str)
+    m_match = _RE_MONTHS.search(age_str)
     
     if y_match or m_match:
         if y_match: years = float(y_match.group(1))
@@ -193,19 +549,65 @@ def parse_age(age_val):
         if years > 1900: years = 0
     else:
         # 4. Fallback: No suffixes, look for "Number Number"
-        nums = re.findall(r'(\d+(\.\d+)?)', age_str)
+        nums = _RE_NUMS.findall(age_str)
         if len(nums) >= 1:
-            val1 = float(nums[0][0])
+            val1 = float(nums[0])
             if val1 > 1900: # First number is a year
-                if len(nums) >= 2: years = float(nums[1][0])
-                if len(nums) >= 3: months = float(nums[2][0])
+                if len(nums) >= 2: years = float(nums[1])
+                if len(nums) >= 3: months = float(nums[2])
             else:
                 years = val1
-                if len(nums) >= 2: months = float(nums[1][0])
+                if len(nums) >= 2: months = float(nums[1])
     
     res = round(years + (months / 12), 2)
     return res if 0 < res < 150 else None
 
+def parse_age_series(s):
+    """
+    Column-wide parse_age. Plain numbers go through one to_numeric pass and
+    date-like strings are dropped with one regex scan; only the remaining distinct
+    free-text values (e.g. "2 yrs 3 months") are handed to parse_age.
+    """
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return pd.Series(np.nan, index=s.index)
+    num = pd.to_numeric(s, errors="coerce")
+    ages = num.where(num < 150).astype(float)
+
+    residue = (num.isna() & s.notna()).to_numpy(dtype=bool)
+    if residue.any():
+        codes, uniques = pd.factorize(s[residue])
+        is_date = pd.Series(uniques, dtype=object).astype(str).str.contains(_RE_DATE_LIKE).to_numpy(dtype=bool)
+        parsed = np.array([np.nan if date_like else parse_age(u) for u, date_like in zip(uniques, is_date)], dtype=float)
+        ages[residue] = parsed[codes]
+    return ages
+
+# WHO haemoglobin cut-offs in g/dL: (normal at or above, mild at or above, moderate at or above)
+HGB_CUTOFFS_UNDER_5 = (11.0, 10.0, 7.0)   # also pregnant women
+HGB_CUTOFFS_5_11 = (11.5, 11.0, 8.0)
+HGB_CUTOFFS_WOMEN = (12.0, 11.0, 8.0)     # also adolescents / missing gender
+HGB_CUTOFFS_MEN = (13.0, 11.0, 8.0)
+HGB_CUTOFF_ROWS = [HGB_CUTOFFS_UNDER_5, HGB_CUTOFFS_5_11, HGB_CUTOFFS_WOMEN, HGB_CUTOFFS_MEN]
+
+# Beneficiary keywords, checked in priority order
+ANEMIA_BENEFICIARY_CUTOFFS = (
+    ("pregnant", HGB_CUTOFFS_UNDER_5),
+    ("5-59 months", HGB_CUTOFFS_UNDER_5),
+    ("5-9 years", HGB_CUTOFFS_5_11),
+    ("adolescent girls", HGB_CUTOFFS_WOMEN),
+    ("adolescent boys", HGB_CUTOFFS_WOMEN),
+    ("reproductive age", HGB_CUTOFFS_WOMEN),
+)
+
+def grade_hgb(hgb, cutoffs):
+    normal, mild, moderate = cutoffs
+    if hgb >= normal:
+        return "normal"
+    if hgb >= mild:
+        return "mild"
+    if hgb >= moderate:
+        return "moderate"
+    return "severe"
+
 def classify_anemia_who(hgb, age, gender, beneficiary):
     """
     Classify anemia based on WHO guidelines.
@@ -242,132 +644,138 @@ def classify_anemia_who(hgb, age, gender, beneficiary):
     beneficiary_str = str(beneficiary).lower().strip() if not pd.isna(beneficiary) else ""
     
     # Determine classification based on beneficiary type OR age
-    
-    # Pregnant Women
-    if "pregnant" in beneficiary_str:
-        if hgb >= 11.0:
-            return "normal"
-        elif hgb >= 10.0:
-            return "mild"
-        elif hgb >= 7.0:
-            return "moderate"
-        else:
-            return "severe"
-    
-    # Children 5-59 Months (6-59 months WHO category)
-    elif "5-59 months" in beneficiary_str or "children 5-59 months" in beneficiary_str:
-        if hgb >= 11.0:
-            return "normal"
-        elif hgb >= 10.0:
-            return "mild"
-        elif hgb >= 7.0:
-            return "moderate"
-        else:
-            return "severe"
-    
-    # Children Aged 5-9 Years
-    elif "5-9 years" in beneficiary_str:
-        if hgb >= 11.5:
-            return "normal"
-        elif hgb >= 11.0:
-            return "mild"
-        elif hgb >= 8.0:
-            return "moderate"
-        else:
-            return "severe"
-    
-    # Adolescent Girls 10-19 Years
-    elif "adolescent girls" in beneficiary_str or ("adolescent" in beneficiary_str and "female" in gender_str):
-        if hgb >= 12.0:
-            return "normal"
-        elif hgb >= 11.0:
-            return "mild"
-        elif hgb >= 8.0:
-            return "moderate"
-        else:
-            return "severe"
-    
-    # Adolescent Boys 10-19 Years
-    elif "adolescent boys" in beneficiary_str or ("adolescent" in beneficiary_str and "male" in gender_str):
-        if hgb >= 12.0:
-            return "normal"
-        elif hgb >= 11.0:
-            return "mild"
-        elif hgb >= 8.0:
-            return "moderate"
-        else:
-            return "severe"
-    
-    # Women Of Reproductive Age (non-pregnant)
-    elif "women of reproductive age" in beneficiary_str or "reproductive age" in beneficiary_str:
-        if hgb >= 12.0:
-            return "normal"
-        elif hgb >= 11.0:
-            return "mild"
-        elif hgb >= 8.0:
-            return "moderate"
-        else:
-            return "severe"
-    
+    for keyword, cutoffs in ANEMIA_BENEFICIARY_CUTOFFS:
+        if keyword in beneficiary_str:
+            return grade_hgb(hgb, cutoffs)
+
+    # Adolescents whose group label omits girls/boys ("male" also matches "female")
+    if "adolescent" in beneficiary_str and "male" in gender_str:
+        return grade_hgb(hgb, HGB_CUTOFFS_WOMEN)
+
     # Fallback: Use age and gender if beneficiary type doesn't match
-    elif age is not None:
-        # Children under 5 years
+    if age is not None:
         if age < 5:
-            if hgb >= 11.0:
-                return "normal"
-            elif hgb >= 10.0:
-                return "mild"
-            elif hgb >= 7.0:
-                return "moderate"
-            else:
-                return "severe"
-        
-        # Children 5-11 years
+            cutoffs = HGB_CUTOFFS_UNDER_5
         elif age < 12:
-            if hgb >= 11.5:
-                return "normal"
-            elif hgb >= 11.0:
-                return "mild"
-            elif hgb >= 8.0:
-                return "moderate"
-            else:
-                return "severe"
-        
+            cutoffs = HGB_CUTOFFS_5_11
         # Adolescents and Adults (12+ years)
+        elif "female" in gender_str or "f" == gender_str:
+            cutoffs = HGB_CUTOFFS_WOMEN
+        elif "male" in gender_str or "m" == gender_str:
+            cutoffs = HGB_CUTOFFS_MEN
         else:
-            # Female thresholds
-            if "female" in gender_str or "f" == gender_str:
-                if hgb >= 12.0:
-                    return "normal"
-                elif hgb >= 11.0:
-                    return "mild"
-                elif hgb >= 8.0:
-                    return "moderate"
-                else:
-                    return "severe"
-            # Male thresholds
-            elif "male" in gender_str or "m" == gender_str:
-                if hgb >= 13.0:
-                    return "normal"
-                elif hgb >= 11.0:
-                    return "mild"
-                elif hgb >= 8.0:
-                    return "moderate"
-                else:
-                    return "severe"
             # Missing gender - use female thresholds (more conservative)
-            else:
-                if hgb >= 12.0:
-                    return "normal"
-                elif hgb >= 11.0:
-                    return "mild"
-                elif hgb >= 8.0:
-                    return "moderate"
-                else:
-                    return "severe"
+            cutoffs = HGB_CUTOFFS_WOMEN
+        return grade_hgb(hgb, cutoffs)
+
     # If we can't determine (missing/unclear beneficiary AND missing age), return incomplete
     return "incomplete"
 
+# Cut-off rows for classify_anemia_who_series, indexed by HGB_CUTOFF_ROWS position
+_WHO_HGB_CUTOFFS = np.array(HGB_CUTOFF_ROWS)
+_ANEMIA_LEVELS = np.array(["normal", "mild", "moderate", "severe"], dtype=object)
+
+def classify_anemia_who_series(hgb, age, gender, beneficiary):
+    """
+    Column-wide classify_anemia_who: each row's WHO cut-offs are picked with
+    boolean masks (same precedence as the scalar version), then HGB is compared
+    against them in one pass instead of calling the classifier per row.
+    """
+    index = hgb.index
+    hgb = pd.to_numeric(hgb, errors="coerce").to_numpy(dtype=float)
+    age = pd.to_numeric(age, errors="coerce").to_numpy(dtype=float)
+
+    # Gender and beneficiary take a handful of distinct values: normalize and test those,
+    # then broadcast back through the factorized codes (the trailing slot is the null sentinel)
+    def distinct(s):
+        codes, uniques = pd.factorize(s)
+        return codes, pd.Series(uniques, dtype=object).astype("string").str.lower().str.strip().fillna("")
+
+    gen = distinct(gender)
+    ben = distinct(beneficiary)
+
+    def broadcast(codes, flags):
+        return np.append(flags.to_numpy(dtype=bool), False)[codes]
+
+    def has(s, sub):
+        codes, uniques = s
+        return broadcast(codes, uniques.str.contains(sub, regex=False))
+
+    def equals(s, value):
+        codes, uniques = s
+        return broadcast(codes, uniques == value)
+
+    is_female = has(gen, "female") | equals(gen, "f")
+    is_male = has(gen, "male") | equals(gen, "m")
+    has_age = ~np.isnan(age)
+
+    rows = HGB_CUTOFF_ROWS.index
+    group = np.select(
+        [has(ben, keyword) for keyword, _ in ANEMIA_BENEFICIARY_CUTOFFS] + [
+            has(ben, "adolescent") & has(gen, "male"),
+            has_age & (age < 5),
+            has_age & (age < 12),
+            has_age & is_male & ~is_female,
+            has_age,
+        ],
+        [rows(cutoffs) for _, cutoffs in ANEMIA_BENEFICIARY_CUTOFFS] + [
+            rows(HGB_CUTOFFS_WOMEN),
+            rows(HGB_CUTOFFS_UNDER_5),
+            rows(HGB_CUTOFFS_5_11),
+            rows(HGB_CUTOFFS_MEN),
+            rows(HGB_CUTOFFS_WOMEN),
+        ],
+        default=-1,
+    )
+
+    cutoffs = _WHO_HGB_CUTOFFS[group]
+    level = (hgb < cutoffs[:, 0]).astype(int) + (hgb < cutoffs[:, 1]) + (hgb < cutoffs[:, 2])
+    result = _ANEMIA_LEVELS[level]
+    # Missing HGB, or neither a recognised beneficiary group nor an age
+    result[np.isnan(hgb) | (group < 0)] = "incomplete"
+    return pd.Series(result, index=index, dtype=object)
+
+def classify_nutritional_status_series(bmi, age, gender, beneficiary):
+    """
+    Column-wide BMI classification. Adult cut-offs (18.5/25/30) are applied to
+    every row at once; only under-19s with a known gender are re-graded, in bulk,
+    from WHO BMI-for-age Z-scores. Pregnancy overrides both.
+    """
+    index = bmi.index
+    bmi = pd.to_numeric(bmi, errors="coerce").to_numpy(dtype=float)
+    age_y = pd.to_numeric(age, errors="coerce").to_numpy(dtype=float)
+    gen = gender.astype("string").str.lower().str.strip().fillna("")
+    ben = beneficiary.astype("string").str.lower().fillna("")
+
+    # Map Gender to WHO 'boys'/'girls'
+    gender_who = np.select(
+        [gen.isin(["male", "m", "boy", "boys"]).to_numpy(dtype=bool),
+         gen.isin(["female", "f", "girl", "girls"]).to_numpy(dtype=bool)],
+        ["boys", "girls"],
+        default="",
+    )
+
+    # Adult Fallback (>= 19 or unknown gender/age)
+    result = np.select(
+        [bmi < 18.5, bmi < 25.0, bmi < 30.0],
+        ["Underweight", "Normal", "Overweight"],
+        default="Obese",
+    ).astype(object)
+
+    # Use WHO Z-scores for children < 19 if gender is known
+    child = ~np.isnan(bmi) & (age_y < 19) & (gender_who != "")
+    if child.any():
+        age_m = age_y[child] * 12.0
+        z = calculate_bmi_z_score_vec(bmi[child], gender_who[child], age_m)
+        result[child] = classify_who_z_score_vec(z, age_m)
+
+    result[np.isnan(bmi)] = "Data Missing"
+
+    # Exemption: If pregnant and BMI >= 30, classify as Obese (pre-pregnancy proxy)
+    pregnant = (ben.str.contains("pregnant", regex=False) | ben.str.contains("(pw)", regex=False)).to_numpy(dtype=bool)
+    result[pregnant] = np.where(bmi[pregnant] >= 30.0, "Obese", "Pregnancy")
+    return pd.Series(result, index=index, dtype=object)
+
 def sync_data_to_sheets(df):
     """
     Sends computed data (Anemia Status, Corrected Age) back to Google Sheets.
@@ -392,23 +800,27 @@ def sync_data_to_sheets(df):
     cols_to_use = [c for c in sync_cols if c in df.columns]
     
     # --- Row-Level Diffing ---
-    diff_rows = []
+    diff_idx = []
+    diff_ids = []
     temp_cache = LAST_SYNC_CACHE.copy()
-    
-    for _, row in df.iterrows():
-        p_id = str(row.get("ID", "")).strip()
+
+    # Zip plain per-column lists instead of iterrows() (no Series built per row)
+    ids = df["ID"].tolist() if "ID" in df.columns else [""] * len(df)
+    columns = [df[c].tolist() for c in cols_to_use]
+    for i, (raw_id, values) in enumerate(zip(ids, zip(*columns))):
+        p_id = str(raw_id).strip()
         if not p_id or p_id.lower() == "nan": continue
         
         # Create a unique signature for this row based on its values
-        row_values = [str(row.get(c, "")).strip() for c in cols_to_use]
-        row_sig = "|".join(row_values)
+        row_sig = row_signature([str(v).strip() for v in values])
         
         # If ID is new OR the data has changed, mark for sync
         if p_id not in LAST_SYNC_CACHE or LAST_SYNC_CACHE[p_id] != row_sig:
-            diff_rows.append(row)
+            diff_idx.append(i)
+            diff_ids.append(p_id)
             temp_cache[p_id] = row_sig
             
-    if not diff_rows:
+    if not diff_idx:
         # print("DEBUG: No changes detected at row level. Skipping background sync.")
         return
     
@@ -417,47 +829,143 @@ def sync_data_to_sheets(df):
     # temp_cache already has the updates.
 
     
-    print(f"DEBUG: Found {len(diff_rows)} new/updated records to sync to Sheets.")
+    print(f"DEBUG: Found {len(diff_idx)} new/updated records to sync to Sheets.")
 
+    synced = 0
     try:
-        import requests
         # Prepare data for sync
-        sync_df = pd.DataFrame(diff_rows)
+        sync_df = df.iloc[diff_idx].copy()
         
         # Convert types for JSON compatibility
         for col in sync_df.columns:
             if pd.api.types.is_datetime64_any_dtype(sync_df[col]):
                 sync_df[col] = sync_df[col].dt.strftime('%Y-%m-%d %H:%M:%S')
         
-        # Critical: Replace NaN with None so they become null in JSON
-        payload = sync_df.replace({pd.NA: None, float('nan'): None}).to_dict("records")
+        # Critical: Replace NaN with None so they become null in JSON (one boolean mask, no per-cell replace)
+        payload = sync_df.astype(object).where(sync_df.notna(), None).to_dict("records")
         
-        # Syncing...
-        r = requests.post(EXCEL_WRITE_URL, json=payload, timeout=120, allow_redirects=True)
-        if r.status_code != 200:
-            print(f"DEBUG: Data sync failed with status {r.status_code}: {r.text[:200]}")
-        else:
+        # Syncing in batches over one keep-alive session. Batches go out one after another:
+        # doPost appends at getLastRow() without a lock, so parallel posts would collide.
+        session = get_sync_session()
+        for start in range(0, len(payload), SYNC_BATCH_SIZE):
+            batch = payload[start:start + SYNC_BATCH_SIZE]
+            if orjson is not None:
+                body = orjson.dumps(batch, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC)
+            else:
+                body = json.dumps(batch).encode("utf-8")
+            content_type = "application/json"
+            if SYNC_GZIP:
+                # Apps Script does not inflate Content-Encoding itself, so the script ungzips explicitly
+                body = base64.b64encode(gzip.compress(body, compresslevel=1))
+                content_type = "application/x-gzip"
+            r = session.post(EXCEL_WRITE_URL, data=body, headers={"Content-Type": content_type},
+                             timeout=120, allow_redirects=True)
+            if r.status_code != 200:
+                print(f"DEBUG: Data sync batch failed with status {r.status_code}: {r.text[:200]}")
+                continue
             print(f"DEBUG: Data sync successful: {r.json().get('message') if r.text.startswith('{') else 'OK'}")
-            # Update cache only after successful delivery
-            LAST_SYNC_CACHE = temp_cache
-            save_sync_cache()
+            # Update cache only after successful delivery, one batch at a time
+            batch_ids = diff_ids[start:start + SYNC_BATCH_SIZE]
+            LAST_SYNC_CACHE = {**LAST_SYNC_CACHE, **{p_id: temp_cache[p_id] for p_id in batch_ids}}
+            synced += len(batch)
     except Exception as e:
         import traceback
         print(f"DEBUG: Data sync exception trace: {traceback.format_exc()}")
+    finally:
+        if synced:
+            save_sync_cache()
+
+# A single long-lived sync worker: refresh_data only queues the latest frame, so a stalled
+# Sheets endpoint can't pile up threads and at most one sync runs at a time
+_SYNC_QUEUE = queue.Queue()
+
+def _sync_worker():
+    while True:
+        df = _SYNC_QUEUE.get()
+        # Collapse any backlog to the newest snapshot; older ones would only be re-diffed
+        while True:
+            try:
+                df = _SYNC_QUEUE.get_nowait()
+            except queue.Empty:
+                break
+        try:
+            sync_data_to_sheets(df)
+        except Exception as e:
+            print(f"DEBUG: Background sync failed: {e}")
+
+threading.Thread(target=_sync_worker, name="sheets-sync", daemon=True).start()
 
 def load_data():
     """
     Fetches data from Google Apps Script. 
     Returns: (df, status_message, is_error)
     """
+    global SOURCE_META
     status_msg = "Live"
     is_error = False
     try:
         import requests
+        # Revalidate instead of re-downloading when upstream sent validators last time
+        headers = {}
+        if SOURCE_META.get("etag"):
+            headers["If-None-Match"] = SOURCE_META["etag"]
+        if SOURCE_META.get("last_modified"):
+            headers["If-Modified-Since"] = SOURCE_META["last_modified"]
         # Increased timeout to 20s to prevent 'Server did not respond' errors on slower links
-        r = requests.get(DATA_SOURCE_URL, timeout=20)
+        r = requests.get(DATA_SOURCE_URL, headers=headers, timeout=20)
         r.raise_for_status()
-        
+        if r.status_code == 304:
+            content_hash = SOURCE_META.get("content_hash")
+            snapshot = snapshot_key(content_hash) if content_hash else None
+            current = _FRAME_REF[0]
+            if current is not None and current[0] == snapshot:
+                return current[1], status_msg, is_error
+            df = load_cached_frame(snapshot) if snapshot else None
+            if df is not None:
+                _FRAME_REF[0] = (snapshot, df)
+                return df, status_msg, is_error
+            # Snapshot is gone; fetch the body unconditionally
+            r = requests.get(DATA_SOURCE_URL, timeout=20)
+            r.raise_for_status()
+    except Exception as e:
+        return pd.DataFrame(), f"Script Error: {str(e)}", True
+
+    # Identical payloads skip parsing, anonymization and classification entirely.
+    # The in-memory frame is served lock-free; the lock only guards rebuilds so
+    # concurrent cold-start refreshes don't all rebuild the same frame.
+    content_hash = hashlib.sha256(r.content).hexdigest()[:16]
+    meta = {
+        "etag": r.headers.get("ETag"),
+        "last_modified": r.headers.get("Last-Modified"),
+        "content_hash": content_hash,
+    }
+    if meta != SOURCE_META:
+        SOURCE_META = meta
+        save_source_meta()
+    snapshot = snapshot_key(content_hash)
+    current = _FRAME_REF[0]
+    if current is not None and current[0] == snapshot:
+        return current[1], status_msg, is_error
+
+    with _DATA_CACHE_LOCK:
+        current = _FRAME_REF[0]
+        if current is not None and current[0] == snapshot:
+            return current[1], status_msg, is_error
+        df = load_cached_frame(snapshot)
+        if df is None:
+            df, status_msg, is_error = process_response(r)
+            if is_error:
+                return df, status_msg, is_error
+            save_cached_frame(snapshot, df)
+        _FRAME_REF[0] = (snapshot, df)
+    return df, status_msg, is_error
+
+def process_response(r):
+    """
+    Parses, anonymizes and classifies a Google Apps Script response.
+    Returns: (df, status_message, is_error)
+    """
+    try:
         try:
             data_json = r.json()
             # Debug: Print a snippet of the JSON to the console
@@ -468,8 +976,13 @@ def load_data():
             else:
                 df = pd.DataFrame(data_json)
         except:
-            from io import StringIO
-            df = pd.read_csv(StringIO(r.text))
+            from io import StringIO, BytesIO
+            try:
+                # Multi-threaded Arrow parser when pyarrow is installed (optional dependency)
+                import pyarrow  # noqa: F401
+                df = pd.read_csv(BytesIO(r.content), engine="pyarrow")
+            except Exception:
+                df = pd.read_csv(StringIO(r.text))
             
         if df.empty:
             return pd.DataFrame(), "No Data in Script", True
@@ -485,25 +998,25 @@ def load_data():
             # Preserve real contact for background logic (WhatsApp) but hide it from the table
             if "Aasha_Contact" in df.columns:
                 df["_real_contact"] = df["Aasha_Contact"].astype(str)
-                df["Aasha_Contact"] = df["Aasha_Contact"].apply(mask_contact)
+                df["Aasha_Contact"] = mask_contact_series(df["Aasha_Contact"])
             
             # Mask sensitive names
             if "Name" in df.columns:
-                df["Name"] = df["Name"].apply(mask_pii_readable)
+                df["Name"] = mask_pii_readable_series(df["Name"])
             if "Household Name" in df.columns:
-                df["Household Name"] = df["Household Name"].apply(mask_pii_readable)
+                df["Household Name"] = mask_pii_readable_series(df["Household Name"])
             if "Email" in df.columns:
-                df["Email"] = df["Email"].apply(mask_pii_readable)
+                df["Email"] = mask_pii_readable_series(df["Email"])
             
             # Mask Staff Names (Traceable format)
             if "Asha_Worker" in df.columns:
-                df["Asha_Worker"] = df["Asha_Worker"].apply(mask_pii_readable)
+                df["Asha_Worker"] = mask_pii_readable_series(df["Asha_Worker"])
             if "field_investigator" in df.columns:
-                df["field_investigator"] = df["field_investigator"].apply(mask_pii_readable)
+                df["field_investigator"] = mask_pii_readable_series(df["field_investigator"])
             if "data_operator" in df.columns:
-                df["data_operator"] = df["data_operator"].apply(mask_pii_readable)
+                df["data_operator"] = mask_pii_readable_series(df["data_operator"])
             if "Collected By" in df.columns:
-                df["Collected By"] = df["Collected By"].apply(mask_pii_readable)
+                df["Collected By"] = mask_pii_readable_series(df["Collected By"])
         # -----------------------------------------------
 
         required_cols = [
@@ -516,6 +1029,11 @@ def load_data():
         ]
         df = df[[c for c in required_cols if c in df.columns]]
 
+        # Blank IDs become missing values once here, so later code only needs notna(). Other IDs
+        # keep their raw text: records are deduplicated on the ID exactly as entered
+        if "ID" in df.columns and not pd.api.types.is_numeric_dtype(df["ID"]):
+            df["ID"] = df["ID"].mask(df["ID"].astype(str).str.strip() == "")
+
         date_cols = ["DATE_F", "enrollment_date", "DOB", "Sample Collected Date"]
         for col in date_cols:
             if col in df.columns:
@@ -558,70 +1076,23 @@ def load_data():
         # Calculate BMI: Weight(kg) / [Height(m)]²
         # Row-level fallback: Use Height if available, otherwise use Length
         if "Weight" in df.columns:
-            h_vals = df["Height"] if "Height" in df.columns else (df["Length"] if "Length" in df.columns else pd.Series([None] * len(df)))
+            h_vals = df["Height"] if "Height" in df.columns else (df["Length"] if "Length" in df.columns else pd.Series(np.nan, index=df.index))
             if "Height" in df.columns and "Length" in df.columns:
                 h_vals = df["Height"].fillna(df["Length"])
             
-            # height in meters, ensure not zero
-            valid_mask = (df["Weight"] > 0) & (h_vals > 0)
-            df["BMI"] = None
-            df.loc[valid_mask, "BMI"] = (df.loc[valid_mask, "Weight"] / ((h_vals.loc[valid_mask] / 100.0) ** 2)).round(2)
+            # height in meters, ensure not zero; computed on float64 arrays, NaN where invalid
+            w = pd.to_numeric(df["Weight"], errors="coerce").to_numpy(dtype="float64")
+            h_m = pd.to_numeric(h_vals, errors="coerce").to_numpy(dtype="float64") / 100.0
+            bmi = np.full(len(df), np.nan)
+            np.divide(w, h_m * h_m, out=bmi, where=(w > 0) & (h_m > 0))
+            df["BMI"] = np.round(bmi, 2)
         else:
             df["BMI"] = None
 
-        def classify_nutritional_status(row):
-            bmi = row.get("BMI")
-            age_y = row.get("Age")
-            beneficiary = str(row.get("Beneficiary", "")).lower()
-            gender_raw = str(row.get("Gender", "")).lower().strip()
-            
-            # Exemption: If pregnant and BMI >= 30, classify as Obese (pre-pregnancy proxy)
-            if "pregnant" in beneficiary or "(pw)" in beneficiary:
-                if not pd.isna(bmi) and bmi >= 30.0:
-                    return "Obese"
-                return "Pregnancy"
-                
-            if pd.isna(bmi) or bmi is None: return "Data Missing"
-            
-            try:
-                val = float(bmi)
-            except:
-                return "Data Missing"
-
-            # Map Gender to WHO 'boys'/'girls'
-            gender_who = None
-            if gender_raw in ["male", "m", "boy", "boys"]:
-                gender_who = "boys"
-            elif gender_raw in ["female", "f", "girl", "girls"]:
-                gender_who = "girls"
-
-            # Use WHO Z-scores for children < 19 if gender is known
-            if age_y is not None and not pd.isna(age_y) and gender_who:
-                try:
-                    age_val = float(age_y)
-                    if age_val < 19:
-                        age_m = age_val * 12.0
-                        # Try/Except inside loop to prevent single row failure from crashing everything
-                        try:
-                            z = calculate_bmi_z_score(val, gender_who, age_m)
-                            if z is not None:
-                                return classify_who_z_score(z, age_m)
-                        except Exception as z_err:
-                            print(f"DEBUG: Z-score calculation failed for row: {z_err}")
-                except Exception as e:
-                    # Fallback to adult logic on error
-                    pass
-
-            # Adult Fallback (>= 19 or unknown gender/age)
-            if val < 18.5: return "Underweight"
-            if val < 25.0: return "Normal"
-            if val < 30.0: return "Overweight"
-            return "Obese"
-        
         # We need Age to be parsed BEFORE classification
         # Parse Age with special logic FIRST
         if "Age" in df.columns:
-            df["Age"] = df["Age"].apply(parse_age)
+            df["Age"] = parse_age_series(df["Age"])
         else:
             df["Age"] = None
             
@@ -643,14 +1114,20 @@ def load_data():
                     # Calculate difference (UTC - UTC is valid)
                     diff = (ref_date[mask] - dob_dt).dt.days
                     
-                    calculated_ages = (diff / 365.25).round(2)
-                    # Only apply if result is sane
-                    df.loc[mask, "Age"] = calculated_ages.apply(lambda x: x if x is not None and 0 <= x < 150 else None)
+                    calculated_ages = np.round(diff.to_numpy(dtype="float64") / 365.25, 2)
+                    # Only apply if result is sane (NaN otherwise, as for an unparseable DOB)
+                    df.loc[mask, "Age"] = np.where((calculated_ages >= 0) & (calculated_ages < 150), calculated_ages, np.nan)
                 except Exception as age_err:
                     print(f"DEBUG: Age calculation fallback failed: {age_err}")
 
         # Now apply classification using the populated Age
-        df["bmi_category"] = df.apply(classify_nutritional_status, axis=1)
+        missing = pd.Series(None, index=df.index, dtype=object)
+        df["bmi_category"] = classify_nutritional_status_series(
+            df["BMI"],
+            df["Age"],
+            df["Gender"] if "Gender" in df.columns else missing,
+            df["Beneficiary"] if "Beneficiary" in df.columns else missing,
+        )
         
         if "Area Code" in df.columns:
             df["Area Code"] = df["Area Code"].astype(str).str.zfill(3)
@@ -664,13 +1141,13 @@ def load_data():
 
         if "anemia_category" in df.columns:
             df["anemia_category"] = df["anemia_category"].astype(str).str.strip()
-            cat_map = {"Normal": "normal", "Mild anemia": "mild", "Moderate anemia": "moderate", "Severe anemia": "severe"}
-            df["anemia_category"] = df["anemia_category"].map(cat_map).fillna(df["anemia_category"].str.lower())
+            df["anemia_category"] = df["anemia_category"].map(ANEMIA_LABEL_MAP).fillna(df["anemia_category"].str.lower())
 
         if "Beneficiary" in df.columns:
-            df["Beneficiary"] = pd.to_numeric(df["Beneficiary"], errors='coerce')
-            df["Beneficiary"] = df["Beneficiary"].map(BENEFICIARY_MAP).fillna(df["Beneficiary"])
-            df["Beneficiary"] = df["Beneficiary"].astype(str).str.title()
+            ben_codes = pd.to_numeric(df["Beneficiary"], errors='coerce')
+            # Resolve labels once per distinct code; store as Categorical (int8 codes, not per-row strings)
+            ben_labels = {c: BENEFICIARY_MAP_TITLE.get(c) or str(c).title() for c in ben_codes.dropna().unique()}
+            df["Beneficiary"] = pd.Categorical(ben_codes.map(ben_labels))
 
         if "BlockCode" in df.columns:
             # Clean and map Block Codes
@@ -682,40 +1159,45 @@ def load_data():
                     return f"{name} ({val})"
                 except:
                     return str(x)
-            
-            df["BlockCode"] = df["BlockCode"].apply(format_block)
 
+            # Format once per distinct raw value (there are only a handful of blocks), then scatter back
+            block_idx, block_raw = pd.factorize(df["BlockCode"])
+            # Trailing slot catches the -1 null sentinel; factorize folds None and NaN
+            # together, so their distinct str() labels are restored below
+            labels = np.array([format_block(x) for x in block_raw] + [None], dtype=object)[block_idx]
+            nulls = block_idx < 0
+            if nulls.any():
+                labels[nulls] = [str(x) for x in df["BlockCode"].to_numpy(dtype=object)[nulls]]
+            df["BlockCode"] = pd.Series(labels, index=df.index).astype("category")
+
+
+        for col in TITLE_COLS:
+            if col in df.columns:
+                df[col] = title_case_series(df[col])
 
-        if "Name" in df.columns:
-            df["Name"] = df["Name"].astype(str).str.title()
-            
-        if "Asha_Worker" in df.columns:
-            df["Asha_Worker"] = df["Asha_Worker"].astype(str).str.title()
-            
         if "Aasha_Contact" in df.columns:
-            # Clean phone numbers (remove non-digits)
-            df["Aasha_Contact"] = df["Aasha_Contact"].astype(str).str.replace(r'\D', '', regex=True)
+            # Clean phone numbers (remove non-digits); blanks and nulls become ""
+            contact = df["Aasha_Contact"].astype(str).str.replace(_RE_NON_DIGIT, '', regex=True).fillna("")
             # Add country code if missing (assumed India +91)
-            def fix_phone(p):
-                if not p or p == "" or p == "nan": return ""
-                if len(p) == 10: return "91" + p
-                return p
-            df["Aasha_Contact"] = df["Aasha_Contact"].apply(fix_phone)
+            df["Aasha_Contact"] = contact.mask(contact.str.len() == 10, "91" + contact)
 
         # Apply WHO-based automatic anemia classification
         if "HGB" in df.columns:
-            df["anemia_category"] = df.apply(
-                lambda row: classify_anemia_who(
-                    row.get("HGB"),
-                    row.get("Age"),
-                    row.get("Gender"),
-                    row.get("Beneficiary")
-                ),
-                axis=1
+            missing = pd.Series(None, index=df.index, dtype=object)
+            df["anemia_category"] = classify_anemia_who_series(
+                df["HGB"],
+                df["Age"] if "Age" in df.columns else missing,
+                df["Gender"] if "Gender" in df.columns else missing,
+                df["Beneficiary"] if "Beneficiary" in df.columns else missing,
             )
         else:
             df["anemia_category"] = None
 
+        # Low-cardinality keys the maps group on: store them as codes (like BlockCode)
+        for col in ("PSU Name", "anemia_category"):
+            if col in df.columns:
+                df[col] = df[col].astype("category")
+
         # FILTER: Keep rows where either Age OR Beneficiary is present
         # Check for valid Age (not None/NaN)
         has_age = df["Age"].notna()
@@ -736,6 +1218,11 @@ def load_data():
     except Exception as e:
         return pd.DataFrame(), f"Script Error: {str(e)}", True
 
+@functools.lru_cache(maxsize=1024)
+def quote_message(msg):
+    """Percent-encodes a WhatsApp message; the same ASHA summary is linked from many rows."""
+    return urllib.parse.quote(msg)
+
 def generate_weekly_summary(df):
     """
     Groups data by Asha Worker and creates a formatted summary for WhatsApp.
@@ -797,83 +1284,225 @@ area_list = []
 anemia_list = ["normal", "mild", "moderate", "severe", "incomplete"]
 
 def area_coordinates():
-    return {
-        'Kunikera': {'lat': 15.2832, 'lon': 76.2142},
-        'Ojanahalli': {'lat': 15.3856, 'lon': 76.1472},
-        'Bannikoppa': {'lat': 15.3877, 'lon': 75.9420},
-        'Tadkal': {'lat': 15.3688, 'lon': 75.9812},
-        'Hulegudda': {'lat': 15.6235, 'lon': 76.1146},
-        'Konasagara': {'lat': 15.6916, 'lon': 76.1030},
-        'Kawalbodur': {'lat': 15.8318, 'lon': 76.1871},
-        'Balutagi': {'lat': 15.87338865573784, 'lon': 76.25665534853232},
-        'HireGonnagar': {'lat': 15.8092, 'lon': 75.9539},
-        'Anegundi': {'lat': 15.3507, 'lon': 76.4925},
-        'Kilarhatti': {'lat': 15.8411, 'lon': 76.4359},
-        'Challur': {'lat': 15.6014, 'lon': 76.5943},
-        'Marlanahalli': {'lat': 15.5771, 'lon': 76.6490},
-        'Gouripur': {'lat': 15.6187547, 'lon': 76.35504569999999},
-        'Hatti': {'lat': 15.2117, 'lon': 75.9350},
-        'Komlapur': {'lat': 15.3405, 'lon':76.0215},
-        'Chikwankal Kunta': {'lat': 15.629761351168723, 'lon':76.23304865792784},
-        'Hire Wankal Kunta': {'lat': 15.646960083050104, 'lon':76.238318366376871},
-        'Talkere': {'lat': 15.645466597713694, 'lon': 76.26477078258641},
-        'Ningalbandi': {'lat': 15.671063605028287, 'lon': 76.13794513593994},
-        'Badimnhal': {'lat': 15.839823262484467, 'lon': 75.95503149946924},
-        'Venkatapur': {'lat': 15.858511392991407, 'lon': 75.97308023163832},
-        'Garjanhal': {'lat': 15.833697603912572, 'lon': 76.41468762354576},
-        'Teggihal': {'lat': 15.849556310249351, 'lon': 76.27912911541603},
-        'Mallapur': {'lat': 15.3933, 'lon': 76.4867},
-        'Rampura': {'lat': 15.3822, 'lon': 76.4816},
-        'Hagedal': {'lat': 15.590418925207551,  'lon':76.59839346965396},
-        'Basrihal': {'lat': 15.595505073968516, 'lon':76.38104641401482},
-        'Chikka Madinal': {'lat': 15.523496092485985, 'lon': 76.3778821765826},
-        'Wadganhal': {'lat': 15.349168758650613, 'lon': 76.0804548913306},
-        'Hirebommanahal': {'lat': 15.597423828789088 , 'lon': 76.2735258247831},
-        'Hiresulikeri': {'lat': 15.52797030965004,'lon':  76.26075289964011 },
-        'Jinnapur': {'lat': 15.490613192523476,'lon':  76.25717388261322},
-        'Belgatti': {'lat': 15.213735760897155, 'lon': 75.9243389399449 },
-        'Kawaloor': {'lat': 15.296976608396339, 'lon': 75.93461733961688},
-        'Kesoor': {'lat': 15.872788521335098, 'lon': 76.19874347785046 },
-        'Gangawati (CMC+OG) WARD No- 0005': {'lat': 15.424340577107621, 'lon': 76.53100417165172},
-        'Gangawati (CMC+OG) WARD No- 0009': {'lat': 15.4280, 'lon': 76.5250},
-        'Gangawati (CMC+OG) WARD No- 0015': {'lat': 15.4330, 'lon': 76.5350},
-        'Koppal (CMC) WARD No-0008': {'lat': 15.3530, 'lon': 76.1580},
-        'Koppal (CMC) WARD No-0021': {'lat': 15.3480, 'lon': 76.1520},
-        'Koppal (CMC) WARD No-0001': {'lat': 15.3550, 'lon': 76.1500}
-    }
+    return AREA_COORDINATES
 
 # Theme Configurations
-THEME_CONFIG = {
-    "dark": {
-        "plotly": "plotly_dark",
-        "mapbox": "carto-darkmatter",
-        "grid": "rgba(255,255,255,0.05)",
-        "tick": "#94a3b8",
-        "text": "#f8fafc",
-        "hover_bg": "#1e293b",
-        "hover_text": "#f8fafc",
-        "legend_bg": "rgba(15, 23, 42, 0.6)",
-        "table_header_bg": "rgba(99, 102, 241, 0.1)",
-        "table_header_text": "#818cf8",
-        "table_cell_bg": "#1e293b"
-    },
-    "light": {
-        "plotly": "plotly_white",
-        "mapbox": "carto-positron",
-        "grid": "rgba(0,0,0,0.05)",
-        "tick": "#475569",
-        "text": "#0f172a",
-        "hover_bg": "#ffffff",
-        "hover_text": "#0f172a",
-        "legend_bg": "rgba(255, 255, 255, 0.7)",
-        "table_header_bg": "rgba(99, 102, 241, 0.05)",
-        "table_header_text": "#4f46e5",
-        "table_cell_bg": "#ffffff"
-    }
-}
+# Resolved once per callback; attribute access on a namedtuple instead of dict lookups
+Theme = namedtuple("Theme", ["plotly", "mapbox", "grid", "tick", "text", "hover_bg", "hover_text", "legend_bg", "table_header_bg", "table_header_text", "table_cell_bg"])
+
+THEME_CONFIG = MappingProxyType({
+    "dark": Theme(
+        plotly="plotly_dark",
+        mapbox="carto-darkmatter",
+        grid="rgba(255,255,255,0.05)",
+        tick="#94a3b8",
+        text="#f8fafc",
+        hover_bg="#1e293b",
+        hover_text="#f8fafc",
+        legend_bg="rgba(15, 23, 42, 0.6)",
+        table_header_bg="rgba(99, 102, 241, 0.1)",
+        table_header_text="#818cf8",
+        table_cell_bg="#1e293b"
+    ),
+    "light": Theme(
+        plotly="plotly_white",
+        mapbox="carto-positron",
+        grid="rgba(0,0,0,0.05)",
+        tick="#475569",
+        text="#0f172a",
+        hover_bg="#ffffff",
+        hover_text="#0f172a",
+        legend_bg="rgba(255, 255, 255, 0.7)",
+        table_header_bg="rgba(99, 102, 241, 0.05)",
+        table_header_text="#4f46e5",
+        table_cell_bg="#ffffff"
+    )
+})
+DEFAULT_THEME = THEME_CONFIG["dark"]
+
+# Each theme's base plotly template, serialized once. Overview charts share these dicts instead of
+# having plotly validate and copy the full named template into every figure on every build.
+THEME_TEMPLATES = MappingProxyType({name: pio.templates[t.plotly].to_plotly_json() for name, t in THEME_CONFIG.items()})
+
+def themed_figure_json(fig, theme):
+    """Plotly JSON for a figure, with the theme's shared pre-serialized template as its layout.template."""
+    fig_json = fig.to_plotly_json()
+    fig_json["layout"]["template"] = THEME_TEMPLATES.get(theme, THEME_TEMPLATES["dark"])
+    return fig_json
+
+@functools.lru_cache(maxsize=1)
+def load_district_boundary():
+    """
+    Parses the district GeoJSON once per process, keeping only the study district's
+    feature(s); a failed load is cached as None too.
+    """
+    try:
+        with open(BOUNDARY_GEOJSON_FILE, "rb") as f:
+            if ijson is not None:
+                features = ijson.items(f, "features.item", use_float=True)
+            else:
+                features = (orjson.loads(f.read()) if orjson is not None else json.load(f))["features"]
+            features = [feat for feat in features if (feat.get("properties") or {}).get("district") == BOUNDARY_DISTRICT]
+        return {"type": "FeatureCollection", "features": features}
+    except Exception as e:
+        print(f"DEBUG: Could not load GeoJSON boundary: {e}")
+        return None
 
+@functools.lru_cache(maxsize=None)
+def district_boundary_trace(name, hoverinfo):
+    """The boundary outline trace, validated once per map flavour; add_trace copies it into each figure."""
+    geojson_data = load_district_boundary()
+    if geojson_data is None:
+        return None
+    return go.Choroplethmap(
+        geojson=geojson_data, locations=[BOUNDARY_DISTRICT], featureidkey="properties.district",
+        z=[1], colorscale=[[0, "rgba(52, 152, 219, 0.1)"], [1, "rgba(52, 152, 219, 0.1)"]],
+        marker_line_width=2, marker_line_color="#2980b9", marker_opacity=0.5,
+        showscale=False, name=name, hoverinfo=hoverinfo
+    )
+
+def as_float32(values):
+    """Map trace coordinates as float32: half the JSON/base64 payload, still sub-metre precision here."""
+    return np.ascontiguousarray(values, dtype=np.float32)
+
+def spiral_offsets(lat, lon):
+    """
+    Spreads points that share a coordinate on a small spiral around it, in row order within
+    each spot; singletons stay put. Uses a stable sort + run lengths instead of a groupby.
+    """
+    order = np.lexsort((lon, lat))
+    lat_sorted, lon_sorted = lat[order], lon[order]
+    new_spot = np.r_[True, (lat_sorted[1:] != lat_sorted[:-1]) | (lon_sorted[1:] != lon_sorted[:-1])]
+    starts = np.flatnonzero(new_spot)
+    sizes = np.diff(np.r_[starts, lat.size])
+    # Position within / size of each shared-coordinate group, scattered back to row order
+    indices = np.empty(lat.size, dtype=np.int64)
+    group_size = np.empty(lat.size, dtype=np.int64)
+    indices[order] = np.arange(lat.size) - np.repeat(starts, sizes)
+    group_size[order] = np.repeat(sizes, sizes)
+    angle = indices * (2 * np.pi / group_size)
+    radius = 0.00015 * np.sqrt(indices) # Tiny offset in degrees (~15m)
+    return lat + radius * np.cos(angle), lon + radius * np.sin(angle)
+
+class LRUCache:
+    """
+    Small thread-safe LRU map for results shared between callbacks (figures, aggregates,
+    responses). Values are handed out as-is, so callers must treat them as read-only.
+    """
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_build(self, key, build):
+        """Cached value for key, else build() stored under it; a None key bypasses the cache."""
+        if key is None:
+            return build()
+        value = self.get(key)
+        if value is None:
+            # Built outside the lock: concurrent misses may both build, the last one is kept
+            value = build()
+            self.put(key, value)
+        return value
+
+_MAP_FIGURE_CACHE = LRUCache(maxsize=32)
+
+def frame_fingerprint(df):
+    """Content key for a DataFrame built from the per-column fingerprints (row order matters, index does not)."""
+    h = hashlib.blake2b(digest_size=16)
+    for col in df.columns:
+        h.update(fast_series_fingerprint(df[col]).tobytes())
+    return h.hexdigest()
+
+def cached_figure(builder):
+    """
+    LRU-caches a map builder on (theme, frame content) so filter/page callbacks that hand it
+    an unchanged frame skip the whole figure build. The cached Figure is shared: don't mutate it.
+    """
+    @functools.wraps(builder)
+    def wrapper(df, theme="dark"):
+        try:
+            key = (theme, df.shape, frame_fingerprint(df))
+        except Exception as e:
+            print(f"DEBUG: Could not fingerprint map frame, building uncached: {e}")
+            return builder(df, theme=theme)
+        return _MAP_FIGURE_CACHE.get_or_build((builder.__name__, key), lambda: builder(df, theme=theme))
+    return wrapper
+
+def _empty_map_figure():
+    fig = go.Figure()
+    fig.add_annotation(text="No data available", showarrow=False)
+    fig.update_layout(
+         paper_bgcolor="rgba(0,0,0,0)",
+         plot_bgcolor="rgba(0,0,0,0)",
+         xaxis=dict(visible=False),
+         yaxis=dict(visible=False)
+    )
+    return fig
+
+# Built once and shared (like the cached maps, don't mutate it)
+EMPTY_MAP_FIGURE = _empty_map_figure()
+
+def has_map_rows(df):
+    """False when no row could be placed on a map: empty frame, or no PSU Name values at all."""
+    return not df.empty and "PSU Name" in df.columns and df["PSU Name"].notna().any()
+
+def plain_column(s):
+    """Categorical columns back to their category dtype (string ops, min/max); others unchanged."""
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return s.astype(s.cat.categories.dtype)
+    return s
+
+def anemia_category_in(s, statuses):
+    """
+    Case-insensitive membership test for an anemia_category column. On a categorical only the
+    few category labels are lowercased and matched; rows are then tested by code.
+    """
+    statuses = {str(x).lower() for x in statuses}
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        cats = s.cat.categories
+        return s.isin(cats[cats.str.lower().isin(statuses)])
+    return s.str.lower().isin(statuses)
+
+def map_frame(df, columns):
+    """
+    Slim working frame for the map builders: the listed source columns, the lowercased
+    anemia category and PSU lat/lon, limited to rows whose PSU has coordinates.
+    Only the needed columns are gathered; the caller's frame is never copied or mutated.
+    """
+    data = {c: plain_column(df[c]) for c in columns if c in df.columns}
+    # Both keys repeat heavily: lowercase / strip + look up the distinct values only and
+    # broadcast back through the factorized codes (the trailing slot catches the -1 null sentinel)
+    lc_codes, lc_uniques = pd.factorize(df["anemia_category"])
+    lc = np.append(pd.Series(lc_uniques, dtype=object).str.lower().to_numpy(dtype=object), None)
+    data["_anemia_lc"] = pd.Series(lc[lc_codes], index=df.index, dtype=object)
+    if "PSU Name" in df.columns:
+        psu_codes, psu_uniques = pd.factorize(df["PSU Name"])
+        psu_key = pd.Series(psu_uniques, dtype=object).astype(str).str.strip()
+        data["lat"] = pd.Series(np.append(psu_key.map(PSU_LAT).to_numpy(dtype=np.float64), np.nan)[psu_codes], index=df.index)
+        data["lon"] = pd.Series(np.append(psu_key.map(PSU_LON).to_numpy(dtype=np.float64), np.nan)[psu_codes], index=df.index)
+    else:
+        data["lat"] = data["lon"] = pd.Series(np.nan, index=df.index)
+    return pd.DataFrame(data).dropna(subset=["lat", "lon"])
+
+@cached_figure
 def create_map(df, theme="dark"):
-    t = THEME_CONFIG.get(theme, THEME_CONFIG["dark"])
+    if not has_map_rows(df):
+        return EMPTY_MAP_FIGURE
+    t = THEME_CONFIG.get(theme, DEFAULT_THEME)
     fig = go.Figure()
     
     # Defaults
@@ -881,37 +1510,16 @@ def create_map(df, theme="dark"):
     default_lon = 76.15
     default_zoom = 8.3
     
-    if df.empty:
-        fig.add_annotation(text="No data available", showarrow=False)
-        fig.update_layout(
-             paper_bgcolor="rgba(0,0,0,0)",
-             plot_bgcolor="rgba(0,0,0,0)",
-             xaxis=dict(visible=False),
-             yaxis=dict(visible=False)
-        )
-        return fig
-        
-    coords = area_coordinates()
-    df = df.copy()
-    if "PSU Name" in df.columns:
-        df["lat"] = df["PSU Name"].astype(str).str.strip().map(lambda x: coords.get(x, {}).get("lat"))
-        df["lon"] = df["PSU Name"].astype(str).str.strip().map(lambda x: coords.get(x, {}).get("lon"))
-    else:
-        df["lat"] = None
-        df["lon"] = None
-    map_df = df.dropna(subset=["lat", "lon"])
+    map_df = map_frame(df, ["PSU Name", "Beneficiary"])
     
     # Calculate Center and Zoom
     if not map_df.empty:
-        center_lat = map_df["lat"].mean()
-        center_lon = map_df["lon"].mean()
+        # One (n, 2) array: column-wise mean and peak-to-peak instead of six Series scans
+        lat_lon = map_df[["lat", "lon"]].to_numpy(dtype=np.float64)
+        center_lat, center_lon = lat_lon.mean(axis=0)
         
         # Determine zoom based on spread
-        lat_min, lat_max = map_df["lat"].min(), map_df["lat"].max()
-        lon_min, lon_max = map_df["lon"].min(), map_df["lon"].max()
-        
-        lat_diff = lat_max - lat_min
-        lon_diff = lon_max - lon_min
+        lat_diff, lon_diff = np.ptp(lat_lon, axis=0)
         max_diff = max(lat_diff, lon_diff)
         
         if max_diff < 0.01: # Single Point or very close
@@ -925,8 +1533,8 @@ def create_map(df, theme="dark"):
             
         # Construct a uirevision key based on the unique locations
         # This ensures camera resets if the set of locations changes, but preserves if just theme changes
-        unique_psus = sorted(map_df["PSU Name"].unique().tolist())
-        ui_rev = f"{len(unique_psus)}_{unique_psus[0] if unique_psus else ''}_{unique_psus[-1] if unique_psus else ''}"
+        psu_col = map_df["PSU Name"]
+        ui_rev = f"{psu_col.nunique()}_{psu_col.min()}_{psu_col.max()}"
     else:
         center_lat = default_lat
         center_lon = default_lon
@@ -934,64 +1542,53 @@ def create_map(df, theme="dark"):
         ui_rev = "empty"
     
     # Calculate counts per PSU and Beneficiary
-    psu_counts = map_df.groupby("PSU Name").size().to_dict() if not map_df.empty else {}
-    benif_breakdown = map_df.groupby(["PSU Name", "Beneficiary"]).size().unstack(fill_value=0).to_dict('index') if not map_df.empty else {}
+    psu_counts = map_df.groupby("PSU Name", observed=True).size().to_dict() if not map_df.empty else {}
     
     # --- Spiderification Logic (Jittering) ---
     # Add small deterministic offsets so overlapping subjects become visible on zoom
     if not map_df.empty:
-        import numpy as np
-        # Group by coordinates and add spread
-        for (lat, lon), group in map_df.groupby(["lat", "lon"]):
-            if len(group) > 1:
-                # Deterministic jitter based on index
-                indices = np.arange(len(group))
-                # Spiral or random spread around the center
-                angle = indices * (2 * np.pi / len(group))
-                radius = 0.00015 * np.sqrt(indices) # Tiny offset in degrees (~15m)
-                map_df.loc[group.index, "lat"] += radius * np.cos(angle)
-                map_df.loc[group.index, "lon"] += radius * np.sin(angle)
-
-    # All defined villages with their count (default 0)
-    village_status = []
-    for v_name, v_coord in coords.items():
-        count = psu_counts.get(v_name, 0)
-        breakdown_dict = benif_breakdown.get(v_name, {})
-        # Create a formatted string for the tooltip
-        breakdown_str = "<br>".join([f"• {k}: {v}" for k, v in breakdown_dict.items() if v > 0])
-        if not breakdown_str:
-            breakdown_str = "No data"
-            
-        status = "No Data" if count == 0 else ("In Progress" if count < 48 else "Complete")
-        color = "#922b21" if count == 0 else ("#e67e22" if count < 48 else "#27ae60")
-        village_status.append({
-            "name": v_name, "lat": v_coord["lat"], "lon": v_coord["lon"],
-            "count": count, "status": status, "color": color, "breakdown": breakdown_str
-        })
-    status_df = pd.DataFrame(village_status)
+        map_df["lat"], map_df["lon"] = spiral_offsets(
+            map_df["lat"].to_numpy(dtype=np.float64), map_df["lon"].to_numpy(dtype=np.float64)
+        )
+
+    # All defined villages with their count (default 0), as whole columns over the PSU table
+    counts = pd.Series(psu_counts, dtype=np.int64).reindex(PSU_LAT.index, fill_value=0).to_numpy()
+    # Tooltip lines from the non-zero (PSU, Beneficiary) counts in long form, joined once per PSU
+    if not map_df.empty:
+        benif_long = map_df.groupby(["PSU Name", "Beneficiary"], observed=True).size().reset_index(name="n")
+        benif_long["line"] = "• " + benif_long["Beneficiary"].astype(str) + ": " + benif_long["n"].astype(str)
+        breakdowns = benif_long.groupby("PSU Name", observed=True)["line"].agg("<br>".join)
+    else:
+        breakdowns = pd.Series(dtype=object)
+    progress = [counts == 0, counts < 48]
+    status_df = pd.DataFrame({
+        "name": PSU_NAMES, "lat": PSU_LAT.to_numpy(), "lon": PSU_LON.to_numpy(),
+        "count": counts,
+        "status": np.select(progress, ["No Data", "In Progress"], "Complete"),
+        "color": np.select(progress, ["#922b21", "#e67e22"], "#27ae60"),
+        "breakdown": breakdowns.reindex(PSU_LAT.index).fillna("No data").to_numpy(),
+    })
+    # Hover HTML composed once per village, so customdata is a single string per point
+    status_df["hover"] = (
+        "<b>" + status_df["name"] + "</b><br>Total Samples: " + status_df["count"].astype(str)
+        + "<br>Status: " + status_df["status"]
+        + "<br><br><b>Beneficiary Breakdown:</b><br>" + status_df["breakdown"]
+    )
 
     # Always try to draw the boundary
-    try:
-        with open("koppal_district_official.geojson", "r") as f:
-            geojson_data = json.load(f)
-        fig.add_trace(go.Choroplethmap(
-            geojson=geojson_data, locations=["Koppal"], featureidkey="properties.district",
-            z=[1], colorscale=[[0, "rgba(52, 152, 219, 0.1)"], [1, "rgba(52, 152, 219, 0.1)"]],
-            marker_line_width=2, marker_line_color="#2980b9", marker_opacity=0.5,
-            showscale=False, name="Study Area Boundary", hoverinfo="name"
-        ))
-    except Exception as e:
-        print(f"DEBUG: Could not load GeoJSON boundary: {e}")
+    boundary_trace = district_boundary_trace("Study Area Boundary", "name")
+    if boundary_trace is not None:
+        fig.add_trace(boundary_trace)
 
     # Add Heatmap for Anemia Cases (High-Risk Focus: Moderate + Severe)
-    heat_df = map_df[map_df["anemia_category"].str.lower().isin(["moderate", "severe"])].copy()
-    if not heat_df.empty:
+    heat_mask = map_df["_anemia_lc"].isin({"moderate", "severe"}).to_numpy()
+    if heat_mask.any():
         # Weight Severe cases (3) higher than Moderate (1) for heat intensity
-        heat_df["weight"] = heat_df["anemia_category"].str.lower().map({"severe": 3, "moderate": 1})
+        heat_weight = np.where(map_df["_anemia_lc"].to_numpy()[heat_mask] == "severe", 3, 1)
         
         fig.add_trace(go.Densitymap(
-            lat=heat_df["lat"], lon=heat_df["lon"],
-            z=heat_df["weight"], 
+            lat=as_float32(map_df["lat"].to_numpy()[heat_mask]), lon=as_float32(map_df["lon"].to_numpy()[heat_mask]),
+            z=as_float32(heat_weight), 
             radius=20,
             colorscale='Magma', 
             showscale=False,
@@ -1002,76 +1599,60 @@ def create_map(df, theme="dark"):
 
     # Add Progress-based Markers (Three Groups)
     categories = [
-        {"name": "No Data Collected", "color": "#922b21", "filter": status_df["count"] == 0},
-        {"name": "In Progress (1-47)", "color": "#e67e22", "filter": (status_df["count"] > 0) & (status_df["count"] < 48)},
-        {"name": "Complete (48+ Samples)", "color": "#27ae60", "filter": status_df["count"] >= 48}
+        {"name": "No Data Collected", "color": "#922b21", "status": "No Data"},
+        {"name": "In Progress (1-47)", "color": "#e67e22", "status": "In Progress"},
+        {"name": "Complete (48+ Samples)", "color": "#27ae60", "status": "Complete"}
     ]
+    # One pass over the village table; each status slice keeps the PSU order
+    status_groups = dict(list(status_df.groupby("status", sort=False)))
     
     for cat in categories:
-        d_cat = status_df[cat["filter"]]
-        if not d_cat.empty:
+        d_cat = status_groups.get(cat["status"])
+        if d_cat is not None:
             fig.add_trace(go.Scattermap(
-                lat=d_cat["lat"], lon=d_cat["lon"], mode="markers+text",
+                lat=as_float32(d_cat["lat"]), lon=as_float32(d_cat["lon"]), mode="markers+text",
                 marker=dict(size=14, color=cat["color"], opacity=0.9),
                 name=cat["name"],
                 text=d_cat["name"],
                 textfont=dict(size=10, color="#2c3e50", family="-apple-system, BlinkMacSystemFont, sans-serif"),
                 textposition="top center",
-                hovertemplate='<b>%{text}</b><br>Total Samples: %{customdata[0]}<br>Status: %{customdata[1]}<br><br><b>Beneficiary Breakdown:</b><br>%{customdata[2]}<extra></extra>',
-                customdata=d_cat[["count", "status", "breakdown"]].values
+                hovertemplate="%{customdata}<extra></extra>",
+                customdata=d_cat["hover"]
             ))
     
     fig.update_layout(
         map=dict(
-            style=t["mapbox"],
+            style=t.mapbox,
             center=dict(lat=center_lat, lon=center_lon),
             zoom=zoom
         ),
         margin=dict(l=0, r=0, t=0, b=0),
-        legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01, bgcolor=t["legend_bg"], font=dict(color=t["tick"])),
-        hoverlabel=dict(bgcolor=t["hover_bg"], font_size=12, font_family="var(--font-family)", font_color=t["hover_text"]),
+        legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01, bgcolor=t.legend_bg, font=dict(color=t.tick)),
+        hoverlabel=dict(bgcolor=t.hover_bg, font_size=12, font_family="var(--font-family)", font_color=t.hover_text),
         uirevision=ui_rev, # Reset view only when data context changes
         paper_bgcolor="rgba(0,0,0,0)",
         plot_bgcolor="rgba(0,0,0,0)"
     )
     return fig
 
+@cached_figure
 def create_treat_map(df, theme="dark"):
-    t = THEME_CONFIG.get(theme, THEME_CONFIG["dark"])
+    if not has_map_rows(df):
+        return EMPTY_MAP_FIGURE
+    t = THEME_CONFIG.get(theme, DEFAULT_THEME)
     fig = go.Figure()
     
     default_lat = 15.6
     default_lon = 76.15
     default_zoom = 8.3
 
-    if df.empty:
-        fig.add_annotation(text="No data available", showarrow=False)
-        fig.update_layout(
-             paper_bgcolor="rgba(0,0,0,0)",
-             plot_bgcolor="rgba(0,0,0,0)",
-             xaxis=dict(visible=False),
-             yaxis=dict(visible=False)
-        )
-        return fig
-        
-    coords = area_coordinates()
-    df = df.copy()
-    if "PSU Name" in df.columns:
-        df["lat"] = df["PSU Name"].astype(str).str.strip().map(lambda x: coords.get(x, {}).get("lat"))
-        df["lon"] = df["PSU Name"].astype(str).str.strip().map(lambda x: coords.get(x, {}).get("lon"))
-    
-    map_df = df.dropna(subset=["lat", "lon"])
+    map_df = map_frame(df, ["PSU Name", "Asha_Worker"])
     
     # Calculate Center and Zoom
     if not map_df.empty:
-        center_lat = map_df["lat"].mean()
-        center_lon = map_df["lon"].mean()
-        
-        lat_min, lat_max = map_df["lat"].min(), map_df["lat"].max()
-        lon_min, lon_max = map_df["lon"].min(), map_df["lon"].max()
-        
-        lat_diff = lat_max - lat_min
-        lon_diff = lon_max - lon_min
+        lat_lon = map_df[["lat", "lon"]].to_numpy(dtype=np.float64)
+        center_lat, center_lon = lat_lon.mean(axis=0)
+        lat_diff, lon_diff = np.ptp(lat_lon, axis=0)
         max_diff = max(lat_diff, lon_diff)
         
         if max_diff < 0.01:
@@ -1083,8 +1664,8 @@ def create_treat_map(df, theme="dark"):
         else:
             zoom = 8.5
             
-        unique_psus = sorted(map_df["PSU Name"].unique().tolist())
-        ui_rev = f"{len(unique_psus)}_{unique_psus[0] if unique_psus else ''}_{unique_psus[-1] if unique_psus else ''}"
+        psu_col = map_df["PSU Name"]
+        ui_rev = f"{psu_col.nunique()}_{psu_col.min()}_{psu_col.max()}"
     else:
         center_lat = default_lat
         center_lon = default_lon
@@ -1093,73 +1674,55 @@ def create_treat_map(df, theme="dark"):
     
     # Calculate counts per PSU for treatment focus
     # We need: Asha Worker names, and Anemic counts (Mild, Moderate, Severe)
-    treat_data = []
-    
-    # PSU-wise aggregates
-    for psu_name, psu_group in map_df.groupby("PSU Name"):
-        ashas = ", ".join(psu_group["Asha_Worker"].dropna().unique()) if "Asha_Worker" in psu_group.columns else "Missing"
-        
-        # Anemia breakdown
-        counts = psu_group["anemia_category"].str.lower().value_counts()
-        mild = counts.get("mild", 0)
-        moderate = counts.get("moderate", 0)
-        severe = counts.get("severe", 0)
-        total_anemic = mild + moderate + severe
-        
-        if total_anemic > 0:
-            color = "#ef4444" if severe > 0 else ("#f97316" if moderate > 0 else "#f59e0b")
-            status = f"<b>{total_anemic}</b> Anemic"
+    # PSU-wise aggregates: one crosstab for the anemia breakdown, one groupby for the Asha names
+    if not map_df.empty:
+        psu_groups = map_df.groupby("PSU Name", observed=True)
+        psu_stats = pd.crosstab(map_df["PSU Name"], map_df["_anemia_lc"]).reindex(
+            index=psu_groups.size().index, columns=["severe", "moderate", "mild", "normal"], fill_value=0
+        )
+        if "Asha_Worker" in map_df.columns:
+            psu_stats["ashas"] = psu_groups["Asha_Worker"].agg(lambda s: ", ".join(pd.unique(s.dropna())))
         else:
-            color = "#10b981"
-            status = "No Anemia"
-            
+            psu_stats["ashas"] = "Missing"
+        # Reuse the coordinates already joined onto map_df; only exact PSU names get a marker
+        psu_stats = psu_stats.join(psu_groups[["lat", "lon"]].first())
+        psu_stats = psu_stats[psu_stats.index.isin(PSU_LAT.index)]
+    else:
+        psu_stats = pd.DataFrame(columns=["severe", "moderate", "mild", "normal", "ashas", "lat", "lon"])
+
+    # Keeping PSU level for Treat Map as requested for "Asha Level Focus";
+    # colour, size and hover text are built column-wise over the PSU stats
+    if not psu_stats.empty:
+        severe, moderate, mild = (psu_stats[c].to_numpy() for c in ("severe", "moderate", "mild"))
+        total_anemic = mild + moderate + severe
+        color = np.select([severe > 0, moderate > 0, mild > 0], ["#ef4444", "#f97316", "#f59e0b"], "#10b981")
+        psu_names = psu_stats.index.to_series()
         hover_text = (
-            f"<b>{psu_name}</b><br><br>"
-            f"Asha Worker: <b>{ashas}</b><br><br>"
-            f"<b>Anemia Breakdown:</b><br>"
-            f"• Severe: <b>{severe}</b><br>"
-            f"• Moderate: <b>{moderate}</b><br>"
-            f"• Mild: <b>{mild}</b><br>"
-            f"• Normal: <b>{counts.get('normal', 0)}</b>"
+            "<b>" + psu_names + "</b><br><br>"
+            "Asha Worker: <b>" + psu_stats["ashas"] + "</b><br><br>"
+            "<b>Anemia Breakdown:</b><br>"
+            "• Severe: <b>" + psu_stats["severe"].astype(str) + "</b><br>"
+            "• Moderate: <b>" + psu_stats["moderate"].astype(str) + "</b><br>"
+            "• Mild: <b>" + psu_stats["mild"].astype(str) + "</b><br>"
+            "• Normal: <b>" + psu_stats["normal"].astype(str) + "</b>"
         )
-        
-        v_coord = coords.get(psu_name, {})
-        if v_coord:
-            # Spiderification for Treat Map: spread subjects slightly
-            # In treat map, we usually show PSU level, but if we wanted subject level, we'd do it differently.
-            # Keeping PSU level for Treat Map as requested for "Asha Level Focus", 
-            # but adding Jitter to the base data if we decide to show individual points.
-            treat_data.append({
-                "name": psu_name, "lat": v_coord["lat"], "lon": v_coord["lon"],
-                "color": color, "hover": hover_text, "size": 12 + (total_anemic * 0.5)
-            })
-
-    if treat_data:
-        t_df = pd.DataFrame(treat_data)
         fig.add_trace(go.Scattermap(
-            lat=t_df["lat"], lon=t_df["lon"], mode="markers",
-            marker=dict(size=t_df["size"], color=t_df["color"], opacity=0.8),
+            lat=as_float32(psu_stats["lat"]), lon=as_float32(psu_stats["lon"]), mode="markers",
+            marker=dict(size=12 + (total_anemic * 0.5), color=color, opacity=0.8),
             name="Urgent PSUs",
-            text=t_df["name"],
+            text=psu_names,
             hovertemplate="%{customdata}<extra></extra>",
-            customdata=t_df["hover"]
+            customdata=hover_text
         ))
 
     # Add Geospatial boundary
-    try:
-        with open("koppal_district_official.geojson", "r") as f:
-            geojson_data = json.load(f)
-        fig.add_trace(go.Choroplethmap(
-            geojson=geojson_data, locations=["Koppal"], featureidkey="properties.district",
-            z=[1], colorscale=[[0, "rgba(52, 152, 219, 0.1)"], [1, "rgba(52, 152, 219, 0.1)"]],
-            marker_line_width=2, marker_line_color="#2980b9", marker_opacity=0.5,
-            showscale=False, name="Boundary", hoverinfo="skip"
-        ))
-    except: pass
+    boundary_trace = district_boundary_trace("Boundary", "skip")
+    if boundary_trace is not None:
+        fig.add_trace(boundary_trace)
 
     fig.update_layout(
         map=dict(
-            style=t["mapbox"],
+            style=t.mapbox,
             center=dict(lat=center_lat, lon=center_lon),
             zoom=zoom
         ),
@@ -1381,7 +1944,7 @@ def get_treat_layout():
             
             # Shared placeholders for Dashboard components (Exclude what Treat page HAS)
             *get_shared_placeholders([
-                "block-code-dropdown", "location-dropdown", "Beneficiary-dropdown", "anemia-dropdown", "btn-clear",
+                "block-code-dropdown", "location-dropdown", "Beneficiary-dropdown", "anemia-dropdown",
                 "urgent-alerts-list", "total", "severe-count", "moderate-count", "mild-count", "avg-hgb", "map", 
                 "severe-table", "moderate-table", "mild-table", "table", "weekly-summary-container",
                 "theme-toggle-mobile"
@@ -1435,6 +1998,8 @@ def get_shared_placeholders(exclude_list):
     """
     Returns a flat list of hidden placeholders for shared IDs to prevent Dash callback errors.
     If an ID is already present in the visible page layout, it should be passed in exclude_list.
+    Only callback outputs need one: the renderer rejects a callback whose output is missing from
+    the page, while absent buttons are declared as allow_optional inputs instead.
     """
     # Ensure components that don't support children (like Input/State/Graph) are handled correctly
     all_outputs = {
@@ -1465,9 +2030,6 @@ def get_shared_placeholders(exclude_list):
         "mild-table": dash_table.DataTable(id="mild-table", style_header={"display": "none"}, style_cell={"display": "none"}),
         "notification-queue-container": html.Div(id="notification-queue-container", style={"display": "none"}),
         "weekly-summary-container": html.Div(id="weekly-summary-container", style={"display": "none"}),
-        "btn-clear": dbc.Button(id="btn-clear", style={"display": "none"}),
-        "btn-excel": dbc.Button(id="btn-excel", style={"display": "none"}),
-        "btn-csv": dbc.Button(id="btn-csv", style={"display": "none"}),
         # "theme-toggle-mobile": html.Div(id="theme-toggle-mobile", style={"display": "none"})
     }
     
@@ -1694,7 +2256,7 @@ def get_dashboard_layout():
             
             # Shared placeholders for Treat Page components (Exclude what Dashboard page HAS)
             *get_shared_placeholders([
-                "block-code-dropdown", "location-dropdown", "Beneficiary-dropdown", "anemia-dropdown", "btn-clear", "btn-excel", "btn-csv",
+                "block-code-dropdown", "location-dropdown", "Beneficiary-dropdown", "anemia-dropdown",
                 "severe-count", "avg-hgb", "diet-count", "map", "Beneficiary-bar", "anemia-pie", 
                 "anemia-village-bar", "block-anemia-bar", "block-prevalence-bar", "hgb-stats-bar", "bmi-bar", "table",
                 "prevalence-val", "normal-count", "mild-count", "moderate-count", "total"
@@ -1707,6 +2269,9 @@ app.layout = html.Div([
     dcc.Location(id="url", refresh=False),
     dcc.Interval(id="interval", interval=60_000, n_intervals=0),
     dcc.Store(id="stored-data"),
+    # Hash of the snapshot in stored-data, kept apart so the refresh tick can send it as State
+    # without uploading the whole snapshot
+    dcc.Store(id="stored-data-hash"),
     dcc.Download(id="download-data"),
 
     dcc.Store(id="theme-store", data="light", storage_type="memory"),
@@ -1774,27 +2339,24 @@ app.layout = html.Div([
     html.Div(id="page-content")
 ], id="main-container")
 
+PAGE_LAYOUTS = {
+    "/treat": get_treat_layout,
+    "/track": get_track_layout,
+}
+
+# Page content and nav highlighting share the same trigger, so one round trip serves both
 @app.callback(
-    Output("page-content", "children"),
+    [Output("page-content", "children"), Output("nav-buttons-container", "children")],
     Input("url", "pathname")
 )
 def display_page(pathname):
     print(f"DEBUG: display_page called. Path: {pathname}")
     # theme = theme_data or "dark" # Default to dark if None
-    if pathname == "/track":
-        return get_track_layout()
-    elif pathname == "/treat":
-        print(f"DEBUG: Calling get_treat_layout")
-        return get_treat_layout()
-    else:
-        # Default to the Main Dashboard (Now under 'Test' branding in Nav)
-        return get_dashboard_layout()
+    # Anything unrouted falls back to the Main Dashboard (Now under 'Test' branding in Nav)
+    page = PAGE_LAYOUTS.get(pathname, get_dashboard_layout)()
+    return page, get_nav_buttons(pathname)
 
-@app.callback(
-    Output("nav-buttons-container", "children"),
-    Input("url", "pathname")
-)
-def update_nav_buttons(pathname):
+def get_nav_buttons(pathname):
     # Define buttons and their target routes
     buttons = [
         {"name": "Test", "href": "/"},
@@ -1806,7 +2368,7 @@ def update_nav_buttons(pathname):
     for btn in buttons:
         is_active = pathname == btn["href"]
         # Special case for root
-        if btn["href"] == "/" and pathname not in ["/treat", "/track"]:
+        if btn["href"] == "/" and pathname not in PAGE_LAYOUTS:
             is_active = True
             
         full_class = "nav-btn nav-btn-standard"
@@ -1818,20 +2380,330 @@ def update_nav_buttons(pathname):
     return nav_links
 
 
-@app.callback(Output("stored-data", "data"), Input("interval", "n_intervals"))
-def refresh_data(_):
+# Recent dashboard responses keyed on (data hash, filters, page, theme)
+_DASHBOARD_CACHE = LRUCache(maxsize=64)
+# Options slot of a dropdown whose option list doesn't depend on its own value (see compute_dropdown_options).
+# Beneficiary and anemia options follow the cleaned location selection, which their own values can change.
+DASHBOARD_OWN_OPTIONS_SLOT = {"block-code-dropdown": 18, "location-dropdown": 19}
+# Positions of the figure outputs in the dashboard response; the only ones the theme changes
+DASHBOARD_FIGURE_SLOTS = range(8, 16)
+# Fixed dashboard responses, built once: zeroed KPIs / blank figures / empty tables for missing data
+# or errors, and "leave everything" for pages that only hold placeholders. Serialized, never mutated.
+EMPTY_DASHBOARD_RESPONSE = tuple([0]*8 + [go.Figure().to_plotly_json()]*8 + [[]]*18)
+NO_DASHBOARD_UPDATE = tuple([no_update] * 34)
+
+# Cleaned (deduplicated) frame for the latest data snapshot: (data_hash, df)
+_CLEAN_FRAME = [None]
+_CLEAN_FRAME_LOCK = threading.Lock()
+
+def encode_stored_records(df):
+    """
+    Packs the snapshot for dcc.Store: base64 Parquet when pyarrow is available (typed, columnar,
+    a fraction of the row-dict JSON), otherwise the classic list of row dicts.
+    """
+    if pyarrow is not None and not df.empty:
+        try:
+            from io import BytesIO
+            buf = BytesIO()
+            df.to_parquet(buf, engine="pyarrow", index=False)
+            return {"records_b64": base64.b64encode(buf.getvalue()).decode("ascii")}
+        except Exception as e:
+            print(f"DEBUG: Parquet store encoding failed, falling back to records: {e}")
+    return {"records": df.to_dict("records")}
+
+def has_stored_records(stored_dict):
+    return bool(stored_dict) and ("records_b64" in stored_dict or "records" in stored_dict)
+
+def stored_has_rows(stored_dict):
+    return "records_b64" in stored_dict or bool(stored_dict.get("records"))
+
+def stored_records_frame(stored_dict):
+    """
+    Rebuilds the snapshot frame from dcc.Store. Parquet columns are brought back to the shapes the
+    JSON records produce (categories as strings, timestamps as ISO strings) so callbacks see the same frame.
+    """
+    if "records_b64" not in stored_dict:
+        return pd.DataFrame(stored_dict.get("records", []))
+    from io import BytesIO
+    df = pd.read_parquet(BytesIO(base64.b64decode(stored_dict["records_b64"])), engine="pyarrow")
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(str)
+        elif pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = df[col].dt.strftime("%Y-%m-%dT%H:%M:%S")
+    return df
+
+def clean_records_frame(df_full):
+    """
+    Builds the dashboard frame from the stored snapshot: one row per ID (latest sample), numeric HGB.
+    """
+    # DEDUPLICATION & CLEANING
+    # Ensure One Record Per Component (ID) - Keep Latest
+    if "ID" in df_full.columns and not df_full.empty:
+        # 1. Filter out rows with missing IDs (if any crept in)
+        # (blank IDs already arrive as missing values from process_response)
+        valid_id = df_full["ID"].notna()
+        positions = np.flatnonzero(valid_id.to_numpy())
+        
+        # 2. Order row positions by date (NaT last, stable) - only an int64 key is sorted, not the frame
+        if "Sample Collected Date" in df_full.columns:
+            df_full["Sample Collected Date"] = pd.to_datetime(df_full["Sample Collected Date"], errors="coerce")
+            dates = df_full["Sample Collected Date"].iloc[positions]
+            date_key = np.where(dates.isna().to_numpy(), np.iinfo(np.int64).max, dates.to_numpy().view("i8"))
+            positions = positions[np.argsort(date_key, kind="stable")]
+        
+        # 3. Keep Last (Latest) per ID, then take the surviving rows in one copy
+        is_older = pd.Series(df_full["ID"].to_numpy()[positions]).duplicated(keep="last").to_numpy()
+        df_full = df_full.take(positions[~is_older])
+        
+        # 4. Coerce numeric columns
+        if "HGB" in df_full.columns:
+            df_full["HGB"] = pd.to_numeric(df_full["HGB"], errors="coerce")
+
+    # 5. Low-cardinality filter/group columns as categoricals: isin, == and groupby work on integer codes.
+    # The measurement columns (HGB, BMI, ...) stay float64: they reach the table and the 2-decimal
+    # stats as-is, and float32 would show 11.7 as 11.699999809.
+    for col in ["PSU Name", "Location", "BlockCode", "anemia_category", "Beneficiary", "bmi_category"]:
+        if col in df_full.columns:
+            df_full[col] = df_full[col].astype("category")
+    return df_full
+
+# Overview chart aggregates keyed on (data hash, filters); a theme switch reuses them
+_AGGREGATE_CACHE = LRUCache(maxsize=32)
+
+def compute_aggregates(df):
+    """
+    Runs the groupbys behind the village, HGB, BMI and block charts once for a filtered frame.
+    Returns a dict of read-only tables; an entry is None when its chart has nothing to show.
+    """
+    aggs = {}
+    aggs["psu_to_code"] = df.set_index("PSU Name")["Area Code"].to_dict() if not df.empty else {}
+    aggs["by_psu_anemia"] = df.groupby(["PSU Name", "anemia_category"], observed=True).size().unstack(fill_value=0)
+
+    # Village-wise HGB mean, SD and anemic count
+    hgb_data = df.dropna(subset=["HGB", "PSU Name"])
+    aggs["by_psu_hgb"] = None
+    aggs["hgb_avg"] = None
+    if not hgb_data.empty:
+        stats = hgb_data.groupby("PSU Name", observed=True)["HGB"].agg(["mean", "std", "count"]).reset_index().round(2)
+        
+        # Calculate Anemic Count (Mild + Moderate + Severe) from the village x category table above
+        # instead of a second groupby; villages without anemic subjects stay out, as in a groupby
+        by_psu_anemia = aggs["by_psu_anemia"]
+        anemic_cols = [c for c in by_psu_anemia.columns if str(c).lower() in ("mild", "moderate", "severe")]
+        anemic_by_psu = by_psu_anemia[anemic_cols].sum(axis=1)
+        anemic_counts = anemic_by_psu[anemic_by_psu > 0].rename("anemic_count").reset_index()
+        
+        # Merge to ensure alignment
+        stats = pd.merge(stats, anemic_counts, on="PSU Name", how="left").fillna(0)
+        stats = stats.sort_values("PSU Name")
+        
+        # Area Codes for labels
+        stats["area_code"] = stats["PSU Name"].map(aggs["psu_to_code"]).astype(str)
+        aggs["by_psu_hgb"] = stats
+        aggs["hgb_avg"] = hgb_data["HGB"].mean()
+
+    # BMI categories per Beneficiary; Pregnant Women follow different clinical benchmarks
+    if "Beneficiary" in df.columns and "bmi_category" in df.columns:
+        df_bmi = df[df["Beneficiary"] != "Pregnant Women"]
+        aggs["by_bmi"] = df_bmi.groupby(["Beneficiary", "bmi_category"], observed=True).size().unstack(fill_value=0)
+    else:
+        aggs["by_bmi"] = pd.DataFrame()
+
+    # Block-wise anemia counts and prevalence
+    aggs["by_block_anemia"] = None
+    aggs["by_block_prev"] = None
+    if "BlockCode" in df.columns and not df.empty:
+        block_anemia_counts = df.groupby(["BlockCode", "anemia_category"], observed=True).size().unstack(fill_value=0)
+        
+        # Ensure all categories exist
+        for cat in ["normal", "mild", "moderate", "severe"]:
+            if cat not in block_anemia_counts.columns:
+                block_anemia_counts[cat] = 0
+            
+        # Sort blocks code-wise if possible, or alphabetical
+        # Since we mapped them to "Name (Code)", sorting index should work well
+        block_anemia_counts = block_anemia_counts.sort_index()
+        aggs["by_block_anemia"] = block_anemia_counts
+
+        block_totals = block_anemia_counts.sum(axis=1)
+        anemic_cols = [c for c in ["mild", "moderate", "severe"] if c in block_anemia_counts.columns]
+        if anemic_cols:
+            block_anemic = block_anemia_counts[anemic_cols].sum(axis=1)
+        else:
+            block_anemic = pd.Series(0, index=block_anemia_counts.index)
+        # Handle division by zero
+        block_prevalence = (block_anemic / block_totals * 100).fillna(0).round(2)
+        aggs["by_block_prev"] = pd.DataFrame({"total": block_totals, "anemic": block_anemic, "prevalence": block_prevalence})
+    return aggs
+
+def cached_aggregates(df, cache_key):
+    return _AGGREGATE_CACHE.get_or_build(cache_key, lambda: compute_aggregates(df))
+
+# Cascading dropdown options keyed on (data hash, filters)
+_DROPDOWN_OPTIONS_CACHE = LRUCache(maxsize=64)
+
+def compute_dropdown_options(df_full, block_code, location, Beneficiary, anemia):
+    """
+    Builds the four cascading option lists, each filtered by the other dropdowns.
+    Each filter's row mask is computed once and combined per list instead of copying the frame.
+    Returns (block_opts, loc_opts, benif_opts, anemia_opts, location) with location cleaned to loc_opts.
+    """
+    def mask_for(col, values):
+        return df_full[col].isin(values) if values and col in df_full.columns else None
+
+    def rows(col, *masks):
+        masks = [m for m in masks if m is not None]
+        if not masks:
+            return df_full[col]
+        return df_full.loc[functools.reduce(lambda a, b: a & b, masks), col]
+
+    no_results = [{"label": "No Results Found", "value": "none", "disabled": True}]
+    m_block = mask_for("BlockCode", block_code)
+    m_benif = mask_for("Beneficiary", Beneficiary)
+    m_anemia = mask_for("anemia_category", anemia)
+
+    # 0. Block Code options: Filtered by others (less common to filter UP, but good for consistency)
+    block_opts = []
+    if "BlockCode" in df_full.columns:
+        block_vals = rows("BlockCode", mask_for("Location", location), m_benif, m_anemia)
+        block_opts = [{"label": x, "value": x} for x in sorted(block_vals.dropna().unique()) if x != "Missing"]
+
+    # 1. Location options: Filtered by Block, Beneficiary, Anemia
+    loc_opts = [{"label": x, "value": x} for x in sorted(rows("Location", m_block, m_benif, m_anemia).dropna().unique())]
+    if not loc_opts:
+        loc_opts = no_results
+
+    # Clean up Location selection if not in new options
+    if location:
+        valid_locs = [o["value"] for o in loc_opts]
+        location = [l for l in location if l in valid_locs]
+    m_loc = mask_for("Location", location)
+
+    # 2. Beneficiary options: Filtered by Block, Location, Anemia
+    benif_opts = [{"label": x, "value": x} for x in sorted(rows("Beneficiary", m_block, m_loc, m_anemia).dropna().unique())]
+    if not benif_opts:
+        benif_opts = no_results
+
+    # 3. Anemia options: Filtered by Block, Location, Beneficiary
+    # Normalize anemia categories to capitalize for label
+    anemia_opts_raw = sorted(rows("anemia_category", m_block, m_loc, m_benif).dropna().unique())
+    anemia_opts = [{"label": x.capitalize(), "value": x} for x in anemia_opts_raw]
+    if not anemia_opts:
+        anemia_opts = no_results
+    return block_opts, loc_opts, benif_opts, anemia_opts, location
+
+def cached_dropdown_options(df_full, cache_key, block_code, location, Beneficiary, anemia):
+    return _DROPDOWN_OPTIONS_CACHE.get_or_build(
+        cache_key, lambda: compute_dropdown_options(df_full, block_code, location, Beneficiary, anemia))
+
+# Filtered rows and KPI counts keyed on (data hash, filters); shared by both pages and every
+# notification state, which each have their own dashboard response
+_FILTERED_VIEW_CACHE = LRUCache(maxsize=64)
+
+def compute_filtered_view(df_full, block_code, location, Beneficiary, anemia):
+    """
+    Applies the dashboard filters to the cleaned frame and counts the KPIs for the selection.
+    Returns the selected row positions plus the counts; the frame itself is taken by the caller.
+    """
+    # Each filter's row mask is built once against df_full and combined
+    masks = []
+    if block_code and "BlockCode" in df_full.columns:
+        masks.append(df_full["BlockCode"].isin(block_code).to_numpy())
+    if location: masks.append(df_full["Location"].isin(location).to_numpy())
+    if Beneficiary: masks.append(df_full["Beneficiary"].isin(Beneficiary).to_numpy())
+    if anemia:
+        # Ensure case-insensitive matching for anemia category
+        masks.append(anemia_category_in(df_full["anemia_category"], anemia).to_numpy())
+    rows = np.flatnonzero(np.logical_and.reduce(masks)) if masks else np.arange(len(df_full))
+    df = df_full.iloc[rows]
+
+    # Robust case-insensitive and substring aware counting for anemia categories:
+    # one value_counts pass over the category codes, then one substring pass over the few labels
+    anemia_counts = dict.fromkeys(("normal", "mild", "moderate", "severe"), 0)
+    if "anemia_category" in df.columns and not df.empty:
+        for label, n in df["anemia_category"].value_counts().items():
+            label = str(label).lower()
+            for status in anemia_counts:
+                if status in label:
+                    anemia_counts[status] += int(n)
+
+    # Diet analytics: Specifically focus on Diet 1 (Mapped from raw 'diet1' or 'diet')
+    # If Diet 2 exists (meaning raw 'diet' and 'diet1' both existed), we check if the user meant specifically diet1.
+    # To be safe and follow "focus on diet1", we'll check Diet 1 which is our primary mapped column.
+    if "Diet 1" in df.columns:
+        diet_yes = (df["Diet 1"].astype(str).str.strip().str.lower() == "yes").sum()
+    elif "Diet 2" in df.columns:
+        # Fallback if diet1 was mapped to Diet 2
+        diet_yes = (df["Diet 2"].astype(str).str.strip().str.lower() == "yes").sum()
+    else:
+        diet_yes = 0
+    return {
+        "rows": rows,
+        **anemia_counts,
+        "diet_yes": diet_yes,
+        "avg_hgb_val": round(df["HGB"].mean(), 2) if not df.empty else 0,
+    }
+
+def cached_filtered_view(df_full, cache_key, block_code, location, Beneficiary, anemia):
+    return _FILTERED_VIEW_CACHE.get_or_build(
+        cache_key, lambda: compute_filtered_view(df_full, block_code, location, Beneficiary, anemia))
+
+def trusted_data_hash(stored_dict):
+    """
+    The snapshot hash sent by the browser, if it names this process's current snapshot; else None.
+    Only a trusted hash may key the process-wide caches: they are shared by every client, so what
+    they hold must come from the server's own frame, never from a client-supplied payload.
+    """
+    current = _FRAME_REF[0]
+    data_hash = stored_dict.get("data_hash")
+    return data_hash if data_hash and current is not None and current[0] == data_hash else None
+
+def cached_records_frame(stored_dict):
+    """
+    Returns the cleaned frame for a data snapshot, rebuilding it only when the snapshot hash changes.
+    The frame is shared between callbacks; callers filter copies of it and never modify it in place.
+    """
+    current = _FRAME_REF[0]
+    data_hash = stored_dict.get("data_hash")
+    if not data_hash or current is None or current[0] != data_hash:
+        # Unknown or stale snapshot (see trusted_data_hash): use the client's records for this response only
+        return clean_records_frame(stored_records_frame(stored_dict))
+    with _CLEAN_FRAME_LOCK:
+        cleaned = _CLEAN_FRAME[0]
+        if cleaned is not None and cleaned[0] == data_hash:
+            return cleaned[1]
+    # Built from the server's frame, sent through the same store encoding and JSON round trip
+    # as the browser's copy so the cleaned frame matches what the client payload decodes to
+    df_full = clean_records_frame(stored_records_frame(json.loads(pio.json.to_json_plotly(encode_stored_records(current[1])))))
+    with _CLEAN_FRAME_LOCK:
+        _CLEAN_FRAME[0] = (data_hash, df_full)
+    return df_full
+
+@app.callback(
+    [Output("stored-data", "data"), Output("stored-data-hash", "data")],
+    Input("interval", "n_intervals"), State("stored-data-hash", "data")
+)
+def refresh_data(_, stored_hash):
     df, msg, is_err = load_data()
     
-    # Automatically sync to sheets in a BACKGROUND THREAD to prevent blocking the UI
+    # Automatically sync to sheets on the BACKGROUND WORKER to prevent blocking the UI
     if not is_err and not df.empty:
-        threading.Thread(target=sync_data_to_sheets, args=(df,), daemon=True).start()
+        _SYNC_QUEUE.put(df)
         
+    # Content hash of the snapshot behind these records; keys the dashboard response cache
+    current = _FRAME_REF[0]
+    data_hash = current[0] if current is not None and current[1] is df else None
+    # This client already holds this snapshot: leave the store alone so nothing downstream re-runs
+    if data_hash and stored_hash == data_hash:
+        return no_update, no_update
     return {
-        "records": df.to_dict("records"),
+        **encode_stored_records(df),
         "status": msg,
         "is_error": is_err,
-        "last_updated": datetime.now().strftime("%H:%M:%S")
-    }
+        "last_updated": datetime.now().strftime("%H:%M:%S"),
+        "data_hash": data_hash,
+    }, data_hash
 
 @app.callback(
     [
@@ -1861,68 +2733,65 @@ def refresh_data(_):
         Input("stored-data", "data"), Input("block-code-dropdown", "value"), Input("location-dropdown", "value"),
         Input("Beneficiary-dropdown", "value"),
         Input("anemia-dropdown", "value"), Input("interval", "n_intervals"),
-        Input("map", "clickData"), Input("anemia-pie", "clickData"),
-        Input("Beneficiary-bar", "clickData"), Input("btn-clear", "n_clicks"),
+        Input("btn-clear", "n_clicks", allow_optional=True),
         Input("url", "pathname"), Input("reset-notification-trigger", "data"),
         Input("theme-store", "data")
     ]
 )
-def update_dashboard(stored_dict, block_code, location, Beneficiary, anemia, n_intervals, map_click, pie_click, bar_click, n_clear, pathname, reset_trigger, theme):
+def update_dashboard(stored_dict, block_code, location, Beneficiary, anemia, n_intervals, n_clear, pathname, reset_trigger, theme):
+    # Send only what the trigger can have changed. New data arrives through stored-data, so a bare
+    # interval tick changes nothing outside Treat (whose notification status is server-side state),
+    # and a theme toggle only re-colours the figures.
+    triggered = {t["prop_id"].split(".")[0] for t in callback_context.triggered}
+    if triggered == {"interval"} and pathname != "/treat":
+        return NO_DASHBOARD_UPDATE
     try:
-        return internal_update_dashboard(stored_dict, block_code, location, Beneficiary, anemia, n_intervals, map_click, pie_click, bar_click, n_clear, pathname, theme)
+        result = internal_update_dashboard(stored_dict, block_code, location, Beneficiary, anemia, n_intervals, n_clear, pathname, theme)
+        if triggered == {"theme-store"} and isinstance(result, tuple):
+            result = tuple(v if i in DASHBOARD_FIGURE_SLOTS else no_update for i, v in enumerate(result))
+        elif len(triggered) == 1 and isinstance(result, tuple):
+            # A dropdown's own change leaves its options as they are; don't resend the list
+            own_slot = DASHBOARD_OWN_OPTIONS_SLOT.get(next(iter(triggered)))
+            if own_slot is not None:
+                result = result[:own_slot] + (no_update,) + result[own_slot + 1:]
+        return result
     except Exception as e:
         import traceback
         print(f"CRITICAL ERROR in update_dashboard: {str(e)}")
         print(traceback.format_exc())
-        return [0]*8 + [go.Figure()]*8 + [[]]*18
+        return EMPTY_DASHBOARD_RESPONSE
 
-def internal_update_dashboard(stored_dict, block_code, location, Beneficiary, anemia, n_intervals, map_click, pie_click, bar_click, n_clear, pathname, theme="dark"):
-    t = THEME_CONFIG.get(theme, THEME_CONFIG["dark"])
-    if not stored_dict or "records" not in stored_dict:
-        # Return 30 elements to match the number of outputs
-        return [0]*8 + [go.Figure()]*8 + [[]]*18
+def internal_update_dashboard(stored_dict, block_code, location, Beneficiary, anemia, n_intervals, n_clear, pathname, theme="dark"):
+    t = THEME_CONFIG.get(theme, DEFAULT_THEME)
+    if not has_stored_records(stored_dict):
+        return EMPTY_DASHBOARD_RESPONSE
     
-    records = stored_dict["records"]
+    # The track page only carries hidden placeholders for these outputs
+    if pathname == "/track":
+        return NO_DASHBOARD_UPDATE
+
     status_msg = stored_dict["status"]
     is_error = stored_dict["is_error"]
     last_upd = stored_dict.get("last_updated", "")
 
-    if not records and is_error:
-        # Return 30 elements
-        return [0]*8 + [go.Figure()]*8 + [[]]*18
+    if not stored_has_rows(stored_dict) and is_error:
+        return EMPTY_DASHBOARD_RESPONSE
 
-    df_full = pd.DataFrame(records)
-    
-    # DEDUPLICATION & CLEANING
-    # Ensure One Record Per Component (ID) - Keep Latest
-    if "ID" in df_full.columns and not df_full.empty:
-        # 1. Convert Date for sorting
-        if "Sample Collected Date" in df_full.columns:
-            df_full["Sample Collected Date"] = pd.to_datetime(df_full["Sample Collected Date"], errors="coerce")
-            df_full = df_full.sort_values(by="Sample Collected Date", ascending=True)
-        
-        # 2. Filter out rows with missing IDs (if any crept in)
-        df_full = df_full[df_full["ID"].notna() & (df_full["ID"].astype(str).str.strip() != "")]
-        
-        # 3. Drop Duplicates - Keep Last (Latest)
-        df_full = df_full.drop_duplicates(subset=["ID"], keep="last")
-        
-        # 4. Coerce numeric columns
-        if "HGB" in df_full.columns:
-            df_full["HGB"] = pd.to_numeric(df_full["HGB"], errors="coerce")
+    # Built once per data snapshot; filter clicks reuse the cleaned frame
+    df_full = cached_records_frame(stored_dict)
     
     # Count unique total for sanity check logging
-    print(f"DEBUG: Total Unique Records after deduplication: {len(df_full)}")
+    logger.debug("Total Unique Records after deduplication: %d", len(df_full))
     
     ctx = callback_context
     triggered_id = ctx.triggered[0]["prop_id"].split(".")[0] if ctx.triggered else None
 
     # EXTREME LOGGING: INPUTS
-    print(f"\n>>> CALLBACK START: {triggered_id}")
-    print(f">>> INPUT BLOCK: {block_code}")
-    print(f">>> INPUT LOCATION: {location}")
-    print(f">>> INPUT BENIF: {Beneficiary}")
-    print(f">>> INPUT ANEMIA: {anemia}")
+    logger.debug("\n>>> CALLBACK START: %s", triggered_id)
+    logger.debug(">>> INPUT BLOCK: %s", block_code)
+    logger.debug(">>> INPUT LOCATION: %s", location)
+    logger.debug(">>> INPUT BENIF: %s", Beneficiary)
+    logger.debug(">>> INPUT ANEMIA: %s", anemia)
     
     # FORCED TYPE ENFORCEMENT
     block_code = [block_code] if isinstance(block_code, str) else (block_code or [])
@@ -1932,134 +2801,51 @@ def internal_update_dashboard(stored_dict, block_code, location, Beneficiary, an
     
     # TRACE LOGGING
 
-    # Handle Chart Interactions (Cross-Filtering)
+    # Chart clicks (map, anemia pie, Beneficiary bar) set the dropdowns in the browser;
+    # see the cross_filter_click clientside callback below
     if triggered_id == "btn-clear":
-        print("DEBUG: Clearing all filters via button.")
+        logger.debug("Clearing all filters via button.")
         block_code, location, Beneficiary, anemia = [], [], [], []
-        
-    elif triggered_id == "map" and map_click:
-        village_clicked = map_click["points"][0].get("text")
-        print(f"DEBUG: Map clicked on: {village_clicked}")
-        if village_clicked and village_clicked in df_full["PSU Name"].values:
-            # Find the full location string for this PSU
-            loc_val = df_full[df_full["PSU Name"] == village_clicked]["Location"].iloc[0]
-            if not location or loc_val not in location:
-                location = [loc_val] 
-                print(f"DEBUG: Location updated from map to: {location}")
-            else:
-                print("DEBUG: Location already contains this village, no change.")
-            
-    elif triggered_id == "anemia-pie" and pie_click:
-        cat_clicked = pie_click["points"][0].get("label").lower()
-        if cat_clicked:
-            anemia = [cat_clicked]
-            print(f"DEBUG: Anemia filter updated to: {anemia}")
-
-    elif triggered_id == "Beneficiary-bar" and bar_click:
-        benif_clicked = bar_click["points"][0].get("x")
-        if benif_clicked:
-            Beneficiary = [benif_clicked]
-            print(f"DEBUG: Beneficiary filter updated to: {Beneficiary}")
+
+    # Same data snapshot + same resolved filters, page and theme give the same response.
+    # Treat-page tables also show notification status, so that state is part of the key there.
+    cache_key = None
+    data_hash = trusted_data_hash(stored_dict)
+    if data_hash:
+        notified = frozenset(NOTIFIED_CACHE.items()) if pathname == "/treat" else None
+        cache_key = (data_hash, tuple(block_code), tuple(location), tuple(Beneficiary), tuple(anemia), pathname, theme, notified)
+        cached = _DASHBOARD_CACHE.get(cache_key)
+        if cached is not None:
+            logger.debug("Serving dashboard from response cache")
+            return cached
 
     driver_triggers = ["stored-data", "interval"]
     # We will always update the dashboard components to ensure they stay in sync with filters
     is_full_update = True 
 
-    # Dynamic Options (Cascading Filters)
-    # 0. Block Code options: Filtered by others (less common to filter UP, but good for consistency)
-    df_block = df_full.copy()
-    if location: df_block = df_block[df_block["Location"].isin(location)]
-    if Beneficiary: df_block = df_block[df_block["Beneficiary"].isin(Beneficiary)]
-    if anemia: df_block = df_block[df_block["anemia_category"].isin(anemia)]
-    
-    block_opts = []
-    if "BlockCode" in df_block.columns:
-        block_opts = [{"label": x, "value": x} for x in sorted(df_block["BlockCode"].dropna().unique()) if x != "Missing"]
-
-    # 1. Location options: Filtered by Block, Beneficiary, Anemia
-    df_loc = df_full.copy()
-    if block_code and "BlockCode" in df_loc.columns: 
-        df_loc = df_loc[df_loc["BlockCode"].isin(block_code)]
-    if Beneficiary: df_loc = df_loc[df_loc["Beneficiary"].isin(Beneficiary)]
-    if anemia: df_loc = df_loc[df_loc["anemia_category"].isin(anemia)]
-    loc_opts = [{"label": x, "value": x} for x in sorted(df_loc["Location"].dropna().unique())]
-    if not loc_opts:
-        loc_opts = [{"label": "No Results Found", "value": "none", "disabled": True}]
-
-    # Clean up Location selection if not in new options
-    if location:
-        valid_locs = [o["value"] for o in loc_opts]
-        location = [l for l in location if l in valid_locs]
-
-    # 2. Beneficiary options: Filtered by Block, Location, Anemia
-    df_benif = df_full.copy()
-    if block_code and "BlockCode" in df_benif.columns: 
-        df_benif = df_benif[df_benif["BlockCode"].isin(block_code)]
-    if location: df_benif = df_benif[df_benif["Location"].isin(location)]
-    if anemia: df_benif = df_benif[df_benif["anemia_category"].isin(anemia)]
-    benif_opts = [{"label": x, "value": x} for x in sorted(df_benif["Beneficiary"].dropna().unique())]
-    if not benif_opts:
-        benif_opts = [{"label": "No Results Found", "value": "none", "disabled": True}]
-
-    # 3. Anemia options: Filtered by Block, Location, Beneficiary
-    df_anemia_opts = df_full.copy()
-    if block_code and "BlockCode" in df_anemia_opts.columns: 
-        df_anemia_opts = df_anemia_opts[df_anemia_opts["BlockCode"].isin(block_code)]
-    if location: df_anemia_opts = df_anemia_opts[df_anemia_opts["Location"].isin(location)]
-    if Beneficiary: df_anemia_opts = df_anemia_opts[df_anemia_opts["Beneficiary"].isin(Beneficiary)]
-    # Normalize anemia categories to capitalize for label
-    anemia_opts_raw = sorted(df_anemia_opts["anemia_category"].dropna().unique())
-    anemia_opts = [{"label": x.capitalize(), "value": x} for x in anemia_opts_raw]
-    if not anemia_opts:
-        anemia_opts = [{"label": "No Results Found", "value": "none", "disabled": True}]
+    # Dynamic Options (Cascading Filters): each list is filtered by the other dropdowns only.
+    # Cached per data snapshot + filters; also returns the location selection cleaned to its options.
+    opts_key = (data_hash, tuple(block_code), tuple(location), tuple(Beneficiary), tuple(anemia)) if data_hash else None
+    block_opts, loc_opts, benif_opts, anemia_opts, location = cached_dropdown_options(df_full, opts_key, block_code, location, Beneficiary, anemia)
 
     # Apply all final filters to the main df for stats/charts
-    # Apply all final filters to the main df for stats/charts
-    # AND for Total Enrollment (Now respecting BlockCode as per user request)
-    df_total = df_full.copy()
-    if block_code and "BlockCode" in df_total.columns: 
-        df_total = df_total[df_total["BlockCode"].isin(block_code)]
-    if location: df_total = df_total[df_total["Location"].isin(location)]
-    if Beneficiary: df_total = df_total[df_total["Beneficiary"].isin(Beneficiary)]
-    if anemia: df_total = df_total[df_total["anemia_category"].str.lower().isin([x.lower() for x in anemia])]
-    
-    total = len(df_total)
-
-    # Main df DOES respect Block Code for all other charts
-    df = df_full.copy()
-    if block_code and "BlockCode" in df.columns: 
-        df = df[df["BlockCode"].isin(block_code)]
-    if location: df = df[df["Location"].isin(location)]
-    if Beneficiary: df = df[df["Beneficiary"].isin(Beneficiary)]
-    if anemia: 
-        # Ensure case-insensitive matching for anemia category
-        df = df[df["anemia_category"].str.lower().isin([x.lower() for x in anemia])]
-
-    print(f"DEBUG: Active Filters - Block: {block_code}, Loc: {location}, Benif: {Beneficiary}, Anemia: {anemia}")
-    print(f"DEBUG: df length after filtering: {len(df)}")
-    
-    # Calculate Total Enrollment based on old logic (now using df_total)
-    # total = len(df_total) # Already calculated above
-    # Robust case-insensitive and substring aware counting for anemia categories
-    def count_anemia(status):
-        if "anemia_category" not in df.columns or df.empty: return 0
-        return df["anemia_category"].astype(str).str.lower().str.contains(status, na=False).sum()
-
-    normal = count_anemia("normal")
-    mild = count_anemia("mild")
-    moderate = count_anemia("moderate")
-    severe = count_anemia("severe")
-    # Diet analytics: Specifically focus on Diet 1 (Mapped from raw 'diet1' or 'diet')
-    # If Diet 2 exists (meaning raw 'diet' and 'diet1' both existed), we check if the user meant specifically diet1.
-    # To be safe and follow "focus on diet1", we'll check Diet 1 which is our primary mapped column.
-    if "Diet 1" in df.columns:
-        diet_yes = (df["Diet 1"].astype(str).str.strip().str.lower() == "yes").sum()
-    elif "Diet 2" in df.columns:
-        # Fallback if diet1 was mapped to Diet 2
-        diet_yes = (df["Diet 2"].astype(str).str.strip().str.lower() == "yes").sum()
-    else:
-        diet_yes = 0
-    avg_hgb_val = round(df["HGB"].mean(), 2) if not df.empty else 0
+    # AND for Total Enrollment (Now respecting BlockCode as per user request).
+    # Rows and KPI counts are cached per data snapshot + resolved filters (see compute_filtered_view)
+    view_key = None
+    if data_hash:
+        view_key = (data_hash, tuple(block_code), tuple(location), tuple(Beneficiary), tuple(anemia))
+    view = cached_filtered_view(df_full, view_key, block_code, location, Beneficiary, anemia)
+    # df gets columns added below, so it is always a copy (take), never df_full itself
+    df = df_full.take(view["rows"])
+
+    total = len(df)
+
+    logger.debug("Active Filters - Block: %s, Loc: %s, Benif: %s, Anemia: %s", block_code, location, Beneficiary, anemia)
+    logger.debug("df length after filtering: %d", len(df))
+    
+    normal, mild, moderate, severe = view["normal"], view["mild"], view["moderate"], view["severe"]
+    diet_yes = view["diet_yes"]
+    avg_hgb_val = view["avg_hgb_val"]
     avg_hgb = f"{avg_hgb_val:.2f}" if avg_hgb_val > 0 else "0.00"
     
     # Prevalence should be based on the FILTERED total (len(df)), not the District Total (total)
@@ -2129,7 +2915,7 @@ def internal_update_dashboard(stored_dict, block_code, location, Beneficiary, an
 
     # Pre-calculate grouped WhatsApp messages for each Asha Worker
     asha_summaries = {}
-    high_risk_df = df[df["anemia_category"].str.lower().isin(["mild", "moderate", "severe"])]
+    high_risk_df = df[anemia_category_in(df["anemia_category"], ["mild", "moderate", "severe"])]
     if not high_risk_df.empty and "Asha_Worker" in df.columns:
         for asha, group in high_risk_df.groupby("Asha_Worker"):
             summary_parts = []
@@ -2144,50 +2930,49 @@ def internal_update_dashboard(stored_dict, block_code, location, Beneficiary, an
             summary_text = "\n\n".join(summary_parts)
             asha_summaries[asha] = f"Hello {asha}, here is the combined list of anemic subjects for follow-up:\n\n{summary_text}\n\nPlease check on them today."
 
-    # Generate WhatsApp Links for all derived tables
-    def generate_wa_link(row):
-        asha_name = row.get("Asha_Worker")
-        # Use unmasked contact for WhatsApp link if available, otherwise fallback
-        raw_contact = str(row.get("_real_contact", row.get("Aasha_Contact", "")))
+    # Generate WhatsApp Links for all derived tables: each Asha's message is encoded once and the
+    # links are assembled column-wise for the anemic rows with a contact and a summary
+    df["whatsapp"] = ""
+    # Use unmasked contact for WhatsApp link if available, otherwise fallback
+    contact_col = "_real_contact" if "_real_contact" in df.columns else "Aasha_Contact"
+    if asha_summaries and contact_col in df.columns:
+        encoded_by_asha = {asha: quote_message(msg) for asha, msg in asha_summaries.items()}
         # IMPORTANT: Strip spaces/dashes/non-digits to prevent markdown link breakage
-        contact = "".join(filter(str.isdigit, raw_contact))
-        cat = str(row.get("anemia_category", "")).lower()
-        
-        if cat in ["mild", "moderate", "severe"] and contact != "" and contact != "nan" and asha_name in asha_summaries:
-            msg = asha_summaries[asha_name]
-            encoded_msg = urllib.parse.quote(msg)
-            link = f"https://wa.me/{contact}?text={encoded_msg}"
-            return f"[![Notify WhatsApp](https://img.shields.io/badge/Notify-WhatsApp-25D366?style=flat-square&logo=whatsapp)]({link})"
-        return ""
-
-    # Apply to main dataframe so all tables benefit
-    df["whatsapp"] = df.apply(generate_wa_link, axis=1)
+        contact = df[contact_col].astype(str).str.replace(_RE_NON_DIGIT, "", regex=True).fillna("")
+        linked = (
+            anemia_category_in(df["anemia_category"], ["mild", "moderate", "severe"])
+            & (contact != "")
+            & df["Asha_Worker"].isin(list(encoded_by_asha))
+        )
+        if linked.any():
+            link = "https://wa.me/" + contact[linked] + "?text=" + df.loc[linked, "Asha_Worker"].map(encoded_by_asha)
+            df.loc[linked, "whatsapp"] = "[![Notify WhatsApp](https://img.shields.io/badge/Notify-WhatsApp-25D366?style=flat-square&logo=whatsapp)](" + link + ")"
     df_table = df.copy()
     
     # ---------------------------------------------------------
     # DPDP COMPLIANCE: MASK PII FOR DISPLAY (Main Table)
     # ---------------------------------------------------------
-    def mask_pii_display(val, is_phone=False):
-        if pd.isna(val) or val == "":
-            return val
-        val = str(val)
+    def mask_pii_display(s, is_phone=False):
+        # Column-wise: every masked character becomes "*" through one regex pass in the string
+        # kernels; blanks and nulls are left as they are
+        present = s.notna() & (s.astype(str) != "")
+        text = s[present].astype(str)
         if is_phone:
-            if len(val) > 4:
-                return "*" * (len(val) - 4) + val[-4:]
-            return val
+            # Keep the last 4 digits
+            masked = text.str[:-4].str.replace(_RE_ANY_CHAR, "*", regex=True) + text.str[-4:]
         else:
-            if len(val) > 1:
-                return val[0] + "*" * (len(val) - 1)
-            return "*"
+            # Keep the first letter; a single character is masked entirely
+            masked = (text.str[0] + text.str[1:].str.replace(_RE_ANY_CHAR, "*", regex=True)).where(text.str.len() > 1, "*")
+        return s.mask(present, masked)
 
     if "Aasha_Contact" in df_table.columns:
-        df_table["Aasha_Contact"] = df_table["Aasha_Contact"].apply(lambda x: mask_pii_display(x, is_phone=True))
+        df_table["Aasha_Contact"] = mask_pii_display(df_table["Aasha_Contact"], is_phone=True)
         
     if "Name" in df_table.columns:
-         df_table["Name"] = df_table["Name"].apply(lambda x: mask_pii_display(x))
+         df_table["Name"] = mask_pii_display(df_table["Name"])
          
     if "Household Name" in df_table.columns:
-         df_table["Household Name"] = df_table["Household Name"].apply(lambda x: mask_pii_display(x))
+         df_table["Household Name"] = mask_pii_display(df_table["Household Name"])
     # ---------------------------------------------------------
 
     # df_table = df_table[available_cols].copy() # Moved down
@@ -2201,7 +2986,7 @@ def internal_update_dashboard(stored_dict, block_code, location, Beneficiary, an
 
     # CAUTION: Removed global .str.title() loop on object columns 
     # as it was corrupting 'whatsapp' markdown links and URLs.
-    # If specific columns need title-casing, they should be handled individually.
+    # Columns that need title-casing are listed in TITLE_COLS and handled once at load.
 
     # Ensure sequential Sl.No for current main table view
     df_table = df_table.reset_index(drop=True)
@@ -2213,378 +2998,356 @@ def internal_update_dashboard(stored_dict, block_code, location, Beneficiary, an
         map_fig = create_treat_map(df, theme=theme)
     else:
         map_fig = create_map(df, theme=theme)
+    show_overview_charts = pathname != "/treat"
     
-    # Age-wise breakdown for Beneficiary Hover
-    def get_age_bucket(age):
-        if pd.isna(age): return "Missing"
-        if age < 1: return f"{int(round(age*12))} Months"
-        if age < 5: return "1-4 Years"
-        if age <=9: return "5-9 Years"
-        if age < 18: return "10-17 Years"
-        if age < 30: return "18-29 Years"
-        if age < 40: return "30-39 Years"
-        if age < 50: return "40-49 Years"
-        return "50+ Years"
-
-    # Inverse map to get codes from names
-    NAME_TO_CODE = {v: k for k, v in BENEFICIARY_MAP.items()}
-
-    benif_counts = df["Beneficiary"].value_counts().sort_index()
-    age_hover_data = []
-    labels_with_codes = []
-    
-    for b_group in benif_counts.index:
-        # Get numeric code
-        b_code = NAME_TO_CODE.get(b_group, b_group)
-        labels_with_codes.append(str(b_code))
-        
-        # Get age breakdown for hover
-        sub = df[df["Beneficiary"] == b_group]
-        buckets = sub["Age"].apply(get_age_bucket).value_counts()
-        b_str = "<br>".join([f"• {b}: {c}" for b, c in buckets.items()])
-        
-        # Build the full hover text
-        hover_label = f"<span style='font-size:14px; color:{t['hover_text']}'><b>{b_code}: {b_group}</b></span><br>"
-        age_hover_data.append(hover_label + f"Total: <b>{len(sub)}</b><br><br><b>Age Breakdown:</b><br>" + b_str)
-
-    # Beneficiary Distribution (Vertical Bar with Codes)
-    benif_bar = go.Figure(go.Bar(
-        x=labels_with_codes,
-        y=benif_counts.values,
-        marker=dict(
-            color="#6366f1",
-            line=dict(color="#312e81", width=2)
-        ),
-        customdata=age_hover_data,
-        hovertemplate="%{customdata}<extra></extra>",
-        opacity=0.9
-    ))
-    benif_bar.update_layout(
-        template=t["plotly"],
-        hoverlabel=dict(bgcolor=t["hover_bg"], font_size=13, font_family="var(--font-family)", font_color=t["hover_text"], bordercolor="rgba(99, 102, 241, 0.2)"),
-        margin=dict(t=40, b=110, l=40, r=20),
-        xaxis=dict(
-            title=dict(text="Beneficiary Code", standoff=0), 
-            automargin=True, 
-            showgrid=False, 
-            tickfont=dict(size=12, color=t["tick"])
-        ),
-        yaxis=dict(title="Count", automargin=True, showgrid=True, gridcolor=t["grid"], tickfont=dict(color=t["tick"])),
-        height=360,
-        uirevision=True, # Preserve selection/zoom state
-        plot_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgba(0,0,0,0)",
-        font=dict(color=t["text"])
-    )
-    benif_bar.update_xaxes(showgrid=False, zeroline=False)
-    benif_bar.update_yaxes(showgrid=True, gridcolor="rgba(255,255,255,0.05)", zeroline=False)
-
-    # Anemia pie
-    # Use explicit counts to ensure alignment with KPI cards
-    # "Normal" here represents "Non-Anemic" (Total - Anemic) to match the "100 - Prevalence" logic
-    non_anemic_count = filtered_total - (mild + moderate + severe)
-    
-    # Define explicit data for the pie to match KPIs exactly
-    pie_labels = ["Normal", "Mild", "Moderate", "Severe"]
-    pie_values = [non_anemic_count, mild, moderate, severe]
-    pie_colors = [color_map["normal"], color_map["mild"], color_map["moderate"], color_map["severe"]]
-    
-    # Get pre-calculated balanced percentages for display text
-    # This ensures the pie chart shows the EXACT same % as the cards
-    pie_texts = [
-        f"{balanced_pcts['normal']:.2f}%",
-        f"{balanced_pcts['mild']:.2f}%",
-        f"{balanced_pcts['moderate']:.2f}%",
-        f"{balanced_pcts['severe']:.2f}%"
-    ]
+    # Overview charts only exist (visibly) on the main dashboard; the treat page keeps
+    # hidden placeholders for them, so they are left untouched there
+    if show_overview_charts:
+        # Shared groupbys for the village, HGB, BMI and block charts
+        aggs = cached_aggregates(df, view_key)
+
+        # Age-wise breakdown for Beneficiary Hover
+        def get_age_bucket(age):
+            if pd.isna(age): return "Missing"
+            if age < 1: return f"{int(round(age*12))} Months"
+            if age < 5: return "1-4 Years"
+            if age <=9: return "5-9 Years"
+            if age < 18: return "10-17 Years"
+            if age < 30: return "18-29 Years"
+            if age < 40: return "30-39 Years"
+            if age < 50: return "40-49 Years"
+            return "50+ Years"
+
+        # Inverse map to get codes from names
+        NAME_TO_CODE = {v: k for k, v in BENEFICIARY_MAP.items()}
+
+        benif_counts = plain_column(df["Beneficiary"]).value_counts().sort_index()
+        age_hover_data = []
+        labels_with_codes = []
     
-    # Filter out zero values to avoid messy empty slices
-    final_labels = []
-    final_values = []
-    final_colors = []
-    final_texts = []
-    
-    for l, v, c, t_str in zip(pie_labels, pie_values, pie_colors, pie_texts):
-        if v > 0:
-            final_labels.append(l)
-            final_values.append(v)
-            final_colors.append(c)
-            final_texts.append(t_str)
-
-    if not final_values:
-        # Fallback for empty data
-        final_labels = ["No Data"]
-        final_values = [1]
-        final_colors = ["#e2e8f0"]
-        final_texts = [""]
-
-    anemia_pie = go.Figure(go.Pie(
-        labels=final_labels,
-        values=final_values,
-        hole=0.6,
-        marker=dict(colors=final_colors,
-                    line=dict(color='white', width=3)),
-        # Use 'text' to force our pre-calculated percentages instead of Plotly's auto-calc
-        text=final_texts,
-        textinfo="percent" if not final_texts[0] else "label+text", 
-        hovertemplate="<b>%{label}</b><br>Count: <b>%{value}</b> (%{text})<extra></extra>",
-        opacity=0.95,
-        sort=False # Keep order: Normal -> Mild -> Mod -> Severe
-    ))
-    anemia_pie.update_layout(
-        template=t["plotly"],
-        hoverlabel=dict(bgcolor=t["hover_bg"], font_size=13, font_family="var(--font-family)", font_color=t["hover_text"], bordercolor="rgba(99, 102, 241, 0.2)"),
-        height=250,
-        uirevision=True, # Preserve slice selection state
-        font=dict(color=t["text"]),
-        plot_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgba(0,0,0,0)",
-        margin=dict(t=0, b=0, l=0, r=0),
-        legend=dict(font=dict(color=t["tick"]), bgcolor="rgba(0,0,0,0)")
-    )
-    # Give the pie more room
-    anemia_pie.update_traces(domain=dict(y=[0.2, 1.0]))
-
-    # Village-wise Anemia Classification (Stacked Bar with Area Codes)
-    psu_to_code = df.set_index("PSU Name")["Area Code"].to_dict() if not df.empty else {}
-    
-    village_anemia = df.groupby(["PSU Name", "anemia_category"]).size().unstack(fill_value=0)
-    village_area_codes = [str(psu_to_code.get(psu, psu)) for psu in village_anemia.index]
-    
-    # Pre-calculate a "dialogue box" summary for each PSU
-    psu_summaries = []
-    for psu in village_anemia.index:
-        counts = village_anemia.loc[psu]
-        summary = f"<span style='font-size:16px; color:#1e293b'><b>{psu}</b></span><br>"
-        # Using Category names the user requested
-        summary += f"Severe: <b>{counts.get('severe', 0)}</b><br>"
-        summary += f"Moderate: <b>{counts.get('moderate', 0)}</b><br>"
-        summary += f"Mild: <b>{counts.get('mild', 0)}</b><br>"
-        summary += f"Normal: <b>{counts.get('normal', 0)}</b>"
-        psu_summaries.append(summary)
-
-    anemia_village_bar = go.Figure()
-    for cat in ["normal", "mild", "moderate", "severe", "incomplete"]:
-        if cat in village_anemia:
-            anemia_village_bar.add_bar(
-                name=cat.capitalize(), 
-                x=village_anemia.index, # Setting X to Name for Header
-                y=village_anemia[cat], 
-                customdata=psu_summaries, 
-                hovertemplate="%{customdata}<extra></extra>",
-                marker=dict(
-                    color=color_map.get(cat),
-                    line=dict(color='white', width=1.5)
-                ),
-                opacity=0.95
-            )
-            
-    anemia_village_bar.update_layout(
-        template=t["plotly"],
-        barmode="stack", 
-        hovermode="closest",
-        margin=dict(t=30, b=80, l=40, r=20),
-        xaxis=dict(
-            title=dict(text="Area Code", standoff=0), 
-            tickvals=village_anemia.index, # Map Names to Ticks
-            ticktext=village_area_codes, # Show Codes on Ticks
-            automargin=True, 
-            showgrid=False, 
-            tickfont=dict(size=11, color=t["tick"]),
-            showline=True, linecolor=t["grid"],
-        ),
-        yaxis=dict(
-            title="Beneficiaries", 
-            automargin=True, 
-            showgrid=True, gridcolor=t["grid"],
-            tickfont=dict(color=t["tick"]),
-            zeroline=False
-        ),
-        legend=dict(orientation="h", yanchor="bottom", y=1.05, xanchor="center", x=0.5, font=dict(size=11, color=t["tick"]), bgcolor="rgba(0,0,0,0)"),
-        plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)",
-        hoverlabel=dict(bgcolor=t["hover_bg"], font_size=13, font_family="var(--font-family)", font_color=t["hover_text"], bordercolor="rgba(99, 102, 241, 0.2)"),
-        height=450,
-        bargap=0.2,
-        uirevision=True # Preserve zoom/pan state
-    )
-
-    # --- Village-wise Bar Chart (Mean & SD STATS) ---
-    hgb_data = df.dropna(subset=["HGB", "PSU Name"])
-    hgb_stats_fig = go.Figure()
-
-    if not hgb_data.empty:
-        # Calculate stats per village
-        stats = hgb_data.groupby("PSU Name")["HGB"].agg(["mean", "std", "count"]).reset_index().round(2)
-        
-        # Calculate Anemic Count (Mild + Moderate + Severe)
-        anemic_df = df[df["anemia_category"].str.lower().isin(["mild", "moderate", "severe"])]
-        anemic_counts = anemic_df.groupby("PSU Name").size().reset_index(name="anemic_count")
-        
-        # Merge to ensure alignment
-        stats = pd.merge(stats, anemic_counts, on="PSU Name", how="left").fillna(0)
-        stats = stats.sort_values("PSU Name")
+        for b_group in benif_counts.index:
+            # Get numeric code
+            b_code = NAME_TO_CODE.get(b_group, b_group)
+            labels_with_codes.append(str(b_code))
         
-        # Bar Chart with Tooltip info (Area Codes for labels)
-        stats["area_code"] = stats["PSU Name"].map(psu_to_code).astype(str)
+            # Get age breakdown for hover
+            sub = df[df["Beneficiary"] == b_group]
+            buckets = sub["Age"].apply(get_age_bucket).value_counts()
+            b_str = "<br>".join([f"• {b}: {c}" for b, c in buckets.items()])
         
-        hgb_stats_fig.add_trace(go.Bar(
-            x=stats["PSU Name"],
-            y=stats["mean"],
-            error_y=dict(type='data', array=stats["std"], visible=True, color="#312e81", thickness=2, width=6),
+            # Build the full hover text
+            hover_label = f"<span style='font-size:14px; color:{t.hover_text}'><b>{b_code}: {b_group}</b></span><br>"
+            age_hover_data.append(hover_label + f"Total: <b>{len(sub)}</b><br><br><b>Age Breakdown:</b><br>" + b_str)
+
+        # Beneficiary Distribution (Vertical Bar with Codes)
+        benif_bar = go.Figure(go.Bar(
+            x=labels_with_codes,
+            y=benif_counts.values,
             marker=dict(
                 color="#6366f1",
-                line=dict(color="#312e81", width=2),
+                line=dict(color="#312e81", width=2)
             ),
-            opacity=0.9,
-            name="Mean HGB",
-            text=stats["mean"].map(lambda x: f"{x:.2f}"),
-            textposition="auto",
-            textfont=dict(color="white", size=10, family="-apple-system, BlinkMacSystemFont, sans-serif"),
-            customdata=stats[["PSU Name", "area_code", "std", "count", "anemic_count"]].values.tolist(),
-            hovertemplate=(
-                "<span style='font-size:16px;'><b>%{customdata[1]} - %{customdata[0]}</b></span><br>" +
-                "Mean HGB: <b>%{y} g/dL</b><br>" +
-                "Std Dev: <b>%{customdata[2]}</b><br>" +
-                "Total Samples: <b>%{customdata[3]}</b><br>" +
-                "Anemic Count: <b>%{customdata[4]}</b><extra></extra>"
-            )
+            customdata=age_hover_data,
+            hovertemplate="%{customdata}<extra></extra>",
+            opacity=0.9
+        ), layout=dict(
+            hoverlabel=dict(bgcolor=t.hover_bg, font_size=13, font_family="var(--font-family)", font_color=t.hover_text, bordercolor="rgba(99, 102, 241, 0.2)"),
+            margin=dict(t=40, b=110, l=40, r=20),
+            xaxis=dict(
+                title=dict(text="Beneficiary Code", standoff=0), 
+                automargin=True, 
+                showgrid=False, 
+                zeroline=False,
+                tickfont=dict(size=12, color=t.tick)
+            ),
+            yaxis=dict(title="Count", automargin=True, showgrid=True, gridcolor=t.grid, zeroline=False, tickfont=dict(color=t.tick)),
+            height=360,
+            uirevision=True, # Preserve selection/zoom state
+            plot_bgcolor="rgba(0,0,0,0)",
+            paper_bgcolor="rgba(0,0,0,0)",
+            font=dict(color=t.text)
         ))
-        
-        group_avg = hgb_data["HGB"].mean()
-        # Add the reference line 
-        hgb_stats_fig.add_hline(y=group_avg, line_dash="dash", line_color="#10b981", line_width=2)
-        
-        # Add legend-style annotation
-        hgb_stats_fig.add_annotation(
-            xref="paper", yref="paper",
-            x=1.0, y=1.08,
-            text=f"<span style='color:#10b981'><b>--</b></span> Dataset Average: <b>{group_avg:.2f}</b>",
-            showarrow=False,
-            font=dict(size=12, family="-apple-system, BlinkMacSystemFont, sans-serif", color=t["text"]),
-            xanchor="right", yanchor="bottom"
-        )
 
-    hgb_stats_fig.update_layout(
-        template=t["plotly"],
-        margin=dict(t=50, b=80, l=50, r=20),
-        hovermode="closest",
-        xaxis=dict(
-            title=dict(text="Area Code", standoff=0), 
-            tickvals=stats["PSU Name"] if not hgb_data.empty else [],
-            ticktext=stats["area_code"] if not hgb_data.empty else [],
-            automargin=True, 
-            showgrid=False, 
-            tickfont=dict(size=11, color=t["tick"]),
-            showline=True, linecolor=t["grid"],
-        ),
-        yaxis=dict(
-            title="Avg Haemoglobin (g/dL)", 
-            automargin=True, 
-            showgrid=True, gridcolor=t["grid"],
-            tickfont=dict(color=t["tick"]),
-            zeroline=False
-        ),
-        plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)",
-        hoverlabel=dict(bgcolor=t["hover_bg"], font_size=13, font_family="var(--font-family)", font_color=t["hover_text"], bordercolor="rgba(99, 102, 241, 0.2)"),
-        height=450,
-        showlegend=False,
-        bargap=0.2,
-        uirevision=True # Preserve zoom/pan state
-    )
+        # Anemia pie
+        # Use explicit counts to ensure alignment with KPI cards
+        # "Normal" here represents "Non-Anemic" (Total - Anemic) to match the "100 - Prevalence" logic
+        non_anemic_count = filtered_total - (mild + moderate + severe)
     
-    # BMI Distribution Bar Chart (Stacked by Beneficiary)
-    if "Beneficiary" in df.columns and "bmi_category" in df.columns:
-        # Exclude Pregnant Women as they follow different clinical benchmarks
-        df_bmi = df[df["Beneficiary"] != "Pregnant Women"]
-        bmi_ben_counts = df_bmi.groupby(["Beneficiary", "bmi_category"]).size().unstack(fill_value=0)
-    else:
-        bmi_ben_counts = pd.DataFrame()
-
-    bmi_colors = {
-        "Severe Underweight": "#7f1d1d", # Darkest Red
-        "Underweight": "#ef4444",        # Standard Red
-        "Normal": "#10b981",             # Emerald
-        "Risk of Overweight": "#3b82f6", # Ocean Blue (for children)
-        "Overweight": "#f59e0b",         # Amber
-        "Obese": "#450a0a",              # Deep Blood Red
-        "Pregnancy": "#8b5cf6",
-        "Data Missing": "#94a3b8"
-    }
+        # Define explicit data for the pie to match KPIs exactly
+        pie_labels = ["Normal", "Mild", "Moderate", "Severe"]
+        pie_values = [non_anemic_count, mild, moderate, severe]
+        pie_colors = [color_map["normal"], color_map["mild"], color_map["moderate"], color_map["severe"]]
     
-    # Unified stacking order
-    stack_order = ["Severe Underweight", "Underweight", "Normal", "Risk of Overweight", "Overweight", "Obese", "Pregnancy", "Data Missing"]
-            
-    bmi_fig = go.Figure()
-    
-    if not bmi_ben_counts.empty:
-        # Pre-calculate summaries for each Beneficiary
-        ben_summaries = {}
-        for ben in bmi_ben_counts.index:
-            row = bmi_ben_counts.loc[ben]
-            parts = []
-            # Use stack_order for consistent ordering in tooltip
-            for c in stack_order:
-                if c in row and row[c] > 0:
-                    parts.append(f"{c}: <b>{row[c]}</b>")
-            # Also add extra categories not in stack_order
-            for c in row.index:
-                if c not in stack_order and row[c] > 0:
-                    parts.append(f"{c}: <b>{row[c]}</b>")
-            ben_summaries[ben] = "<br>".join(parts)
-
-        # Map summaries to the x-axis order
-        custom_data_list = [ben_summaries.get(b, "") for b in bmi_ben_counts.index]
-
-        # Ensure all columns exist for consistent coloring even if count is 0
-        present_cats = [c for c in stack_order if c in bmi_ben_counts.columns]
-        # Also add any unexpected categories found in data
-        extra_cats = [c for c in bmi_ben_counts.columns if c not in stack_order]
-        final_order = present_cats + extra_cats
-        
-        for cat in final_order:
-            if cat in bmi_ben_counts:
-                bmi_fig.add_trace(go.Bar(
-                    name=cat,
-                    x=bmi_ben_counts.index,
-                    y=bmi_ben_counts[cat],
+        # Get pre-calculated balanced percentages for display text
+        # This ensures the pie chart shows the EXACT same % as the cards
+        pie_texts = [
+            f"{balanced_pcts['normal']:.2f}%",
+            f"{balanced_pcts['mild']:.2f}%",
+            f"{balanced_pcts['moderate']:.2f}%",
+            f"{balanced_pcts['severe']:.2f}%"
+        ]
+    
+        # Filter out zero values to avoid messy empty slices
+        final_labels = []
+        final_values = []
+        final_colors = []
+        final_texts = []
+    
+        for l, v, c, t_str in zip(pie_labels, pie_values, pie_colors, pie_texts):
+            if v > 0:
+                final_labels.append(l)
+                final_values.append(v)
+                final_colors.append(c)
+                final_texts.append(t_str)
+
+        if not final_values:
+            # Fallback for empty data
+            final_labels = ["No Data"]
+            final_values = [1]
+            final_colors = ["#e2e8f0"]
+            final_texts = [""]
+
+        anemia_pie = go.Figure(go.Pie(
+            labels=final_labels,
+            values=final_values,
+            hole=0.6,
+            marker=dict(colors=final_colors,
+                        line=dict(color='white', width=3)),
+            # Use 'text' to force our pre-calculated percentages instead of Plotly's auto-calc
+            text=final_texts,
+            textinfo="percent" if not final_texts[0] else "label+text", 
+            hovertemplate="<b>%{label}</b><br>Count: <b>%{value}</b> (%{text})<extra></extra>",
+            opacity=0.95,
+            sort=False, # Keep order: Normal -> Mild -> Mod -> Severe
+            domain=dict(y=[0.2, 1.0]) # Give the pie more room
+        ), layout=dict(
+            hoverlabel=dict(bgcolor=t.hover_bg, font_size=13, font_family="var(--font-family)", font_color=t.hover_text, bordercolor="rgba(99, 102, 241, 0.2)"),
+            height=250,
+            uirevision=True, # Preserve slice selection state
+            font=dict(color=t.text),
+            plot_bgcolor="rgba(0,0,0,0)",
+            paper_bgcolor="rgba(0,0,0,0)",
+            margin=dict(t=0, b=0, l=0, r=0),
+            legend=dict(font=dict(color=t.tick), bgcolor="rgba(0,0,0,0)")
+        ))
+
+        # Village-wise Anemia Classification (Stacked Bar with Area Codes)
+        psu_to_code = aggs["psu_to_code"]
+    
+        village_anemia = aggs["by_psu_anemia"]
+        village_area_codes = [str(psu_to_code.get(psu, psu)) for psu in village_anemia.index]
+    
+        # Pre-calculate a "dialogue box" summary for each PSU
+        psu_summaries = []
+        for psu in village_anemia.index:
+            counts = village_anemia.loc[psu]
+            summary = f"<span style='font-size:16px; color:#1e293b'><b>{psu}</b></span><br>"
+            # Using Category names the user requested
+            summary += f"Severe: <b>{counts.get('severe', 0)}</b><br>"
+            summary += f"Moderate: <b>{counts.get('moderate', 0)}</b><br>"
+            summary += f"Mild: <b>{counts.get('mild', 0)}</b><br>"
+            summary += f"Normal: <b>{counts.get('normal', 0)}</b>"
+            psu_summaries.append(summary)
+
+        anemia_village_bar = go.Figure(layout=dict(
+            barmode="stack", 
+            hovermode="closest",
+            margin=dict(t=30, b=80, l=40, r=20),
+            xaxis=dict(
+                title=dict(text="Area Code", standoff=0), 
+                tickvals=village_anemia.index, # Map Names to Ticks
+                ticktext=village_area_codes, # Show Codes on Ticks
+                automargin=True, 
+                showgrid=False, 
+                tickfont=dict(size=11, color=t.tick),
+                showline=True, linecolor=t.grid,
+            ),
+            yaxis=dict(
+                title="Beneficiaries", 
+                automargin=True, 
+                showgrid=True, gridcolor=t.grid,
+                tickfont=dict(color=t.tick),
+                zeroline=False
+            ),
+            legend=dict(orientation="h", yanchor="bottom", y=1.05, xanchor="center", x=0.5, font=dict(size=11, color=t.tick), bgcolor="rgba(0,0,0,0)"),
+            plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)",
+            hoverlabel=dict(bgcolor=t.hover_bg, font_size=13, font_family="var(--font-family)", font_color=t.hover_text, bordercolor="rgba(99, 102, 241, 0.2)"),
+            height=450,
+            bargap=0.2,
+            uirevision=True # Preserve zoom/pan state
+        ))
+        for cat in ["normal", "mild", "moderate", "severe", "incomplete"]:
+            if cat in village_anemia:
+                anemia_village_bar.add_bar(
+                    name=cat.capitalize(), 
+                    x=village_anemia.index, # Setting X to Name for Header
+                    y=village_anemia[cat], 
+                    customdata=psu_summaries, 
+                    hovertemplate="%{customdata}<extra></extra>",
                     marker=dict(
-                        color=bmi_colors.get(cat, "#cbd5e1"),
-                        line=dict(color="white", width=1)
+                        color=color_map.get(cat),
+                        line=dict(color='white', width=1.5)
                     ),
-                    customdata=custom_data_list,
-                    # Hover: Show current segment + Full Summary
-                    hovertemplate="<b>%{x}</b><br>" + cat + ": <b>%{y}</b><br><br><b>Total Breakdown:</b><br>%{customdata}<extra></extra>"
-                ))
-    else:
-        # Fallback empty chart 
-        bmi_fig.add_annotation(text="No Data", showarrow=False, xref="paper", yref="paper", x=0.5, y=0.5)
-
-    bmi_fig.update_layout(
-        template=t["plotly"],
-        barmode="stack",
-        margin=dict(t=60, b=50, l=50, r=20),
-        xaxis=dict(title="Beneficiary Type", showgrid=False, tickfont=dict(color=t["tick"])),
-        yaxis=dict(title="Count", showgrid=True, gridcolor=t["grid"], tickfont=dict(color=t["tick"])),
-        plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)",
-        hoverlabel=dict(bgcolor=t["hover_bg"], font_size=13, font_family="var(--font-family)", font_color=t["hover_text"], bordercolor="rgba(99, 102, 241, 0.2)"),
-        height=450,
-        bargap=0.3,
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5, font=dict(size=10, color=t["tick"])),
-        uirevision=True,
-        annotations=[
-            dict(
-                x=1.0, y=1.15,
+                    opacity=0.95
+                )
+            
+
+        # --- Village-wise Bar Chart (Mean & SD STATS) ---
+        stats = aggs["by_psu_hgb"]
+        hgb_stats_fig = go.Figure(layout=dict(
+            margin=dict(t=50, b=80, l=50, r=20),
+            hovermode="closest",
+            xaxis=dict(
+                title=dict(text="Area Code", standoff=0), 
+                tickvals=stats["PSU Name"] if stats is not None else [],
+                ticktext=stats["area_code"] if stats is not None else [],
+                automargin=True, 
+                showgrid=False, 
+                tickfont=dict(size=11, color=t.tick),
+                showline=True, linecolor=t.grid,
+            ),
+            yaxis=dict(
+                title="Avg Haemoglobin (g/dL)", 
+                automargin=True, 
+                showgrid=True, gridcolor=t.grid,
+                tickfont=dict(color=t.tick),
+                zeroline=False
+            ),
+            plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)",
+            hoverlabel=dict(bgcolor=t.hover_bg, font_size=13, font_family="var(--font-family)", font_color=t.hover_text, bordercolor="rgba(99, 102, 241, 0.2)"),
+            height=450,
+            showlegend=False,
+            bargap=0.2,
+            uirevision=True # Preserve zoom/pan state
+        ))
+
+        if stats is not None:
+            # Bar Chart with Tooltip info (Area Codes for labels)
+            hgb_stats_fig.add_trace(go.Bar(
+                x=stats["PSU Name"],
+                y=stats["mean"],
+                error_y=dict(type='data', array=stats["std"], visible=True, color="#312e81", thickness=2, width=6),
+                marker=dict(
+                    color="#6366f1",
+                    line=dict(color="#312e81", width=2),
+                ),
+                opacity=0.9,
+                name="Mean HGB",
+                text=stats["mean"].map(lambda x: f"{x:.2f}"),
+                textposition="auto",
+                textfont=dict(color="white", size=10, family="-apple-system, BlinkMacSystemFont, sans-serif"),
+                customdata=stats[["PSU Name", "area_code", "std", "count", "anemic_count"]].values.tolist(),
+                hovertemplate=(
+                    "<span style='font-size:16px;'><b>%{customdata[1]} - %{customdata[0]}</b></span><br>" +
+                    "Mean HGB: <b>%{y} g/dL</b><br>" +
+                    "Std Dev: <b>%{customdata[2]}</b><br>" +
+                    "Total Samples: <b>%{customdata[3]}</b><br>" +
+                    "Anemic Count: <b>%{customdata[4]}</b><extra></extra>"
+                )
+            ))
+        
+            group_avg = aggs["hgb_avg"]
+            # Add the reference line 
+            hgb_stats_fig.add_hline(y=group_avg, line_dash="dash", line_color="#10b981", line_width=2)
+        
+            # Add legend-style annotation
+            hgb_stats_fig.add_annotation(
                 xref="paper", yref="paper",
-                text="ⓘ",
+                x=1.0, y=1.08,
+                text=f"<span style='color:#10b981'><b>--</b></span> Dataset Average: <b>{group_avg:.2f}</b>",
                 showarrow=False,
-                font=dict(size=20, color=t["tick"]),
-                hovertext="Terminology: 'Underweight' corresponds to WHO 'Thinness/Wasted' categories. Pregnant Women are excluded from this chart.",
-                align="right"
+                font=dict(size=12, family="-apple-system, BlinkMacSystemFont, sans-serif", color=t.text),
+                xanchor="right", yanchor="bottom"
             )
-        ]
-    )
-    bmi_fig.update_xaxes(showline=True, linecolor=t["grid"])
-    # ----------------------------------------------
+
+    
+        # BMI Distribution Bar Chart (Stacked by Beneficiary, Pregnant Women excluded)
+        bmi_ben_counts = aggs["by_bmi"]
+
+        bmi_colors = {
+            "Severe Underweight": "#7f1d1d", # Darkest Red
+            "Underweight": "#ef4444",        # Standard Red
+            "Normal": "#10b981",             # Emerald
+            "Risk of Overweight": "#3b82f6", # Ocean Blue (for children)
+            "Overweight": "#f59e0b",         # Amber
+            "Obese": "#450a0a",              # Deep Blood Red
+            "Pregnancy": "#8b5cf6",
+            "Data Missing": "#94a3b8"
+        }
+    
+        # Unified stacking order
+        stack_order = ["Severe Underweight", "Underweight", "Normal", "Risk of Overweight", "Overweight", "Obese", "Pregnancy", "Data Missing"]
+            
+        bmi_fig = go.Figure(layout=dict(
+            barmode="stack",
+            margin=dict(t=60, b=50, l=50, r=20),
+            xaxis=dict(title="Beneficiary Type", showgrid=False, tickfont=dict(color=t.tick), showline=True, linecolor=t.grid),
+            yaxis=dict(title="Count", showgrid=True, gridcolor=t.grid, tickfont=dict(color=t.tick)),
+            plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)",
+            hoverlabel=dict(bgcolor=t.hover_bg, font_size=13, font_family="var(--font-family)", font_color=t.hover_text, bordercolor="rgba(99, 102, 241, 0.2)"),
+            height=450,
+            bargap=0.3,
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5, font=dict(size=10, color=t.tick)),
+            uirevision=True,
+            annotations=[
+                dict(
+                    x=1.0, y=1.15,
+                    xref="paper", yref="paper",
+                    text="ⓘ",
+                    showarrow=False,
+                    font=dict(size=20, color=t.tick),
+                    hovertext="Terminology: 'Underweight' corresponds to WHO 'Thinness/Wasted' categories. Pregnant Women are excluded from this chart.",
+                    align="right"
+                )
+            ]
+        ))
+    
+        if not bmi_ben_counts.empty:
+            # Pre-calculate summaries for each Beneficiary
+            ben_summaries = {}
+            for ben in bmi_ben_counts.index:
+                row = bmi_ben_counts.loc[ben]
+                parts = []
+                # Use stack_order for consistent ordering in tooltip
+                for c in stack_order:
+                    if c in row and row[c] > 0:
+                        parts.append(f"{c}: <b>{row[c]}</b>")
+                # Also add extra categories not in stack_order
+                for c in row.index:
+                    if c not in stack_order and row[c] > 0:
+                        parts.append(f"{c}: <b>{row[c]}</b>")
+                ben_summaries[ben] = "<br>".join(parts)
+
+            # Map summaries to the x-axis order
+            custom_data_list = [ben_summaries.get(b, "") for b in bmi_ben_counts.index]
+
+            # Ensure all columns exist for consistent coloring even if count is 0
+            present_cats = [c for c in stack_order if c in bmi_ben_counts.columns]
+            # Also add any unexpected categories found in data
+            extra_cats = [c for c in bmi_ben_counts.columns if c not in stack_order]
+            final_order = present_cats + extra_cats
+        
+            for cat in final_order:
+                if cat in bmi_ben_counts:
+                    bmi_fig.add_trace(go.Bar(
+                        name=cat,
+                        x=bmi_ben_counts.index,
+                        y=bmi_ben_counts[cat],
+                        marker=dict(
+                            color=bmi_colors.get(cat, "#cbd5e1"),
+                            line=dict(color="white", width=1)
+                        ),
+                        customdata=custom_data_list,
+                        # Hover: Show current segment + Full Summary
+                        hovertemplate="<b>%{x}</b><br>" + cat + ": <b>%{y}</b><br><br><b>Total Breakdown:</b><br>%{customdata}<extra></extra>"
+                    ))
+        else:
+            # Fallback empty chart 
+            bmi_fig.add_annotation(text="No Data", showarrow=False, xref="paper", yref="paper", x=0.5, y=0.5)
+
+        # ----------------------------------------------
+    else:
+        benif_bar = anemia_pie = anemia_village_bar = hgb_stats_fig = bmi_fig = no_update
 
     # Urgent Alerts (Severe Anemia)
     urgent_df = df_full[df_full["anemia_category"] == "severe"].head(10)
@@ -2602,7 +3365,7 @@ def internal_update_dashboard(stored_dict, block_code, location, Beneficiary, an
             is_valid_asha = asha_name and str(asha_name).lower() not in ["nan", "none", "", "missing"]
             if is_valid_asha:
                 msg = asha_summaries[asha_name]
-                encoded_msg = urllib.parse.quote(msg)
+                encoded_msg = quote_message(msg)
                 link = f"https://wa.me/{contact}?text={encoded_msg}"
                 wa_btn = html.A(html.I(className="fab fa-whatsapp", style={"color": "#25D366", "marginLeft": "10px", "fontSize": "1.1rem"}), 
                                 href=link, target="_blank")
@@ -2640,8 +3403,8 @@ def internal_update_dashboard(stored_dict, block_code, location, Beneficiary, an
         if not (pathname in ["/", None] and c in ["Asha_Worker", "whatsapp"])
     ]
 
-    print(f">>> RETURNING LOCATION: {location}")
-    print(f">>> CALLBACK END: {triggered_id}\n")
+    logger.debug(">>> RETURNING LOCATION: %s", location)
+    logger.debug(">>> CALLBACK END: %s\n", triggered_id)
 
     # --- Treat Page Specific Tables ---
     treat_cols = [
@@ -2662,18 +3425,18 @@ def internal_update_dashboard(stored_dict, block_code, location, Beneficiary, an
 
     if pathname == "/treat":
         # We use the filtered 'df' to populate these tables
-        df_severe = df[df["anemia_category"].str.lower() == "severe"].copy()
-        df_moderate = df[df["anemia_category"].str.lower() == "moderate"].copy()
-        df_mild = df[df["anemia_category"].str.lower() == "mild"].copy()
+        df_severe = df[anemia_category_in(df["anemia_category"], ["severe"])].copy()
+        df_moderate = df[anemia_category_in(df["anemia_category"], ["moderate"])].copy()
+        df_mild = df[anemia_category_in(df["anemia_category"], ["mild"])].copy()
 
         # DPDP COMPLIANCE: MASK PII
         for d in [df_severe, df_moderate, df_mild]:
             if "Aasha_Contact" in d.columns:
-                d["Aasha_Contact"] = d["Aasha_Contact"].apply(lambda x: mask_pii_display(x, is_phone=True))
+                d["Aasha_Contact"] = mask_pii_display(d["Aasha_Contact"], is_phone=True)
             if "Name" in d.columns:
-                 d["Name"] = d["Name"].apply(lambda x: mask_pii_display(x))
+                 d["Name"] = mask_pii_display(d["Name"])
             if "Household Name" in d.columns:
-                 d["Household Name"] = d["Household Name"].apply(lambda x: mask_pii_display(x))
+                 d["Household Name"] = mask_pii_display(d["Household Name"])
 
         # Generate Status based on cache
         def get_notify_status(row):
@@ -2708,160 +3471,167 @@ def internal_update_dashboard(stored_dict, block_code, location, Beneficiary, an
         moderate_data = df_moderate.to_dict("records")
         mild_data = df_mild.to_dict("records")
 
-    # --- Weekly Summaries for Supervisor ---
-    summaries = generate_weekly_summary(df)
-    summary_cards = []
-    if summaries:
-        for s in summaries:
-            encoded_text = urllib.parse.quote(s["text"])
-            wa_link = f"https://wa.me/{s['contact']}?text={encoded_text}"
+    # Weekly summary cards are only shown on the treat page
+    weekly_summary_content = no_update
+    if pathname == "/treat":
+        # --- Weekly Summaries for Supervisor ---
+        summaries = generate_weekly_summary(df)
+        summary_cards = []
+        if summaries:
+            for s in summaries:
+                encoded_text = quote_message(s["text"])
+                wa_link = f"https://wa.me/{s['contact']}?text={encoded_text}"
             
-            card = dbc.Card([
-                dbc.CardBody([
-                    dbc.Row([
-                        dbc.Col([
-                            html.H6(s["asha"], className="mb-0", style={"fontWeight": "700", "color": "var(--text-main)"}),
-                            html.P(f"{s['village']} | {s['count']} cases" if s["asha"] != "Asha Details Missing" else f"{s['count']} cases", 
-                                   className="mb-0", style={"fontSize": "0.75rem", "color": "var(--text-muted)"})
-                        ], md=8, xs=8),
-                        dbc.Col([
-                            dbc.Button([html.I(className="fab fa-whatsapp")], 
-                                       id={"type": "btn-notify-asha", "index": s["asha"]},
-                                       href=wa_link, target="_blank", color="success", outline=True, size="sm", className="w-100 mb-1, notify-btn"),
-                            dbc.Button([html.I(className="fas fa-undo")], 
-                                       id={"type": "btn-reset-asha", "index": s["asha"]},
-                                       color="secondary", outline=True, size="sm", className="w-100", title="Reset Notification Status")
-                        ], md=4, xs=4) if s.get("show_whatsapp", True) else None
+                card = dbc.Card([
+                    dbc.CardBody([
+                        dbc.Row([
+                            dbc.Col([
+                                html.H6(s["asha"], className="mb-0", style={"fontWeight": "700", "color": "var(--text-main)"}),
+                                html.P(f"{s['village']} | {s['count']} cases" if s["asha"] != "Asha Details Missing" else f"{s['count']} cases", 
+                                       className="mb-0", style={"fontSize": "0.75rem", "color": "var(--text-muted)"})
+                            ], md=8, xs=8),
+                            dbc.Col([
+                                dbc.Button([html.I(className="fab fa-whatsapp")], 
+                                           id={"type": "btn-notify-asha", "index": s["asha"]},
+                                           href=wa_link, target="_blank", color="success", outline=True, size="sm", className="w-100 mb-1, notify-btn"),
+                                dbc.Button([html.I(className="fas fa-undo")], 
+                                           id={"type": "btn-reset-asha", "index": s["asha"]},
+                                           color="secondary", outline=True, size="sm", className="w-100", title="Reset Notification Status")
+                            ], md=4, xs=4) if s.get("show_whatsapp", True) else None
+                        ])
                     ])
-                ])
-            ], className="mb-2 shadow-sm", style={"borderRadius": "10px", "border": "1px solid var(--glass-border)", "background": "var(--card-bg)"})
-            summary_cards.append(dbc.Col(card, md=4, sm=6))
+                ], className="mb-2 shadow-sm", style={"borderRadius": "10px", "border": "1px solid var(--glass-border)", "background": "var(--card-bg)"})
+                summary_cards.append(dbc.Col(card, md=4, sm=6))
         
-        weekly_summary_content = dbc.Row(summary_cards)
-    else:
-        weekly_summary_content = html.P("No anemic cases found for summary.", style={"color": "var(--text-muted)", "fontSize": "0.85rem", "fontStyle": "italic"})
+            weekly_summary_content = dbc.Row(summary_cards)
+        else:
+            weekly_summary_content = html.P("No anemic cases found for summary.", style={"color": "var(--text-muted)", "fontSize": "0.85rem", "fontStyle": "italic"})
+
+    if show_overview_charts:
+        # Block-wise Anemia Distribution Chart
+        block_anemia_counts = aggs["by_block_anemia"]
+        if block_anemia_counts is not None:
+            block_prev = aggs["by_block_prev"]
+
+            # Prepare Custom Hover Data (Dialogue Box Style)
+            block_summaries = []
+            for block in block_anemia_counts.index:
+                row = block_anemia_counts.loc[block]
+                summary = f"<span style='font-size:16px;'><b>{block}</b></span><br>"
+                summary += f"Severe: <b>{row.get('severe', 0)}</b><br>"
+                summary += f"Moderate: <b>{row.get('moderate', 0)}</b><br>"
+                summary += f"Mild: <b>{row.get('mild', 0)}</b><br>"
+                summary += f"Normal: <b>{row.get('normal', 0)}</b><br>" 
+                summary += f"Total: <b>{row.sum()}</b>"
+                block_summaries.append(summary)
+
+            block_fig = go.Figure(layout=dict(
+                barmode='stack',
+                paper_bgcolor="rgba(0,0,0,0)",
+                plot_bgcolor="rgba(0,0,0,0)",
+                margin=dict(l=20, r=20, t=20, b=20),
+                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, font=dict(color=t.tick)),
+                font=dict(family="Outfit, sans-serif", color=t.text),
+                hoverlabel=dict(bgcolor=t.hover_bg, font_size=13, font_family="var(--font-family)", font_color=t.hover_text, bordercolor="rgba(99, 102, 241, 0.2)"),
+                xaxis=dict(showgrid=False, tickfont=dict(color=t.tick)),
+                yaxis=dict(showgrid=True, gridcolor=t.grid, tickfont=dict(color=t.tick))
+            ))
 
-    # Block-wise Anemia Distribution Chart
-    block_fig = go.Figure()
-    block_prev_fig = go.Figure()
-    if "BlockCode" in df.columns and not df.empty:
-        # Aggregate data
-        block_anemia_counts = df.groupby(["BlockCode", "anemia_category"]).size().unstack(fill_value=0)
-        
-        # Ensure all categories exist
-        for cat in ["normal", "mild", "moderate", "severe"]:
-            if cat not in block_anemia_counts.columns:
-                block_anemia_counts[cat] = 0
-                
-        # Sort blocks code-wise if possible, or alphabetical
-        # Since we mapped them to "Name (Code)", sorting index should work well
-        block_anemia_counts = block_anemia_counts.sort_index()
+            # Add Traces
+            colors = {"normal": "#10b981", "mild": "#f59e0b", "moderate": "#f97316", "severe": "#ef4444"}
+            for cat in ["normal", "mild", "moderate", "severe"]: 
+                if cat in block_anemia_counts.columns:
+                    block_fig.add_trace(go.Bar(
+                        x=block_anemia_counts.index,
+                        y=block_anemia_counts[cat],
+                        name=cat.capitalize(),
+                        marker_color=colors.get(cat, "#ccc"),
+                        customdata=block_summaries,
+                        hovertemplate="%{customdata}<extra></extra>"
+                    ))
+
+            # Add Total Count Labels on Top
+            block_totals = block_prev["total"]
+            block_fig.add_trace(go.Scatter(
+                x=block_totals.index,
+                y=block_totals.values,
+                text=block_totals.values,
+                mode='text',
+                textposition='top center',
+                textfont=dict(color=t.text, size=12, weight='bold'),
+                showlegend=False,
+                hoverinfo='text',
+                customdata=block_summaries,
+                hovertemplate="%{customdata}<extra></extra>"
+            ))
 
-        # Prepare Custom Hover Data (Dialogue Box Style)
-        block_summaries = []
-        for block in block_anemia_counts.index:
-            row = block_anemia_counts.loc[block]
-            summary = f"<span style='font-size:16px;'><b>{block}</b></span><br>"
-            summary += f"Severe: <b>{row.get('severe', 0)}</b><br>"
-            summary += f"Moderate: <b>{row.get('moderate', 0)}</b><br>"
-            summary += f"Mild: <b>{row.get('mild', 0)}</b><br>"
-            summary += f"Normal: <b>{row.get('normal', 0)}</b><br>" 
-            summary += f"Total: <b>{row.sum()}</b>"
-            block_summaries.append(summary)
-
-        # Add Traces
-        colors = {"normal": "#10b981", "mild": "#f59e0b", "moderate": "#f97316", "severe": "#ef4444"}
-        for cat in ["normal", "mild", "moderate", "severe"]: 
-            if cat in block_anemia_counts.columns:
-                block_fig.add_trace(go.Bar(
-                    x=block_anemia_counts.index,
-                    y=block_anemia_counts[cat],
-                    name=cat.capitalize(),
-                    marker_color=colors.get(cat, "#ccc"),
-                    customdata=block_summaries,
-                    hovertemplate="%{customdata}<extra></extra>"
-                ))
-
-        # Add Total Count Labels on Top
-        block_totals = block_anemia_counts.sum(axis=1)
-        block_fig.add_trace(go.Scatter(
-            x=block_totals.index,
-            y=block_totals.values,
-            text=block_totals.values,
-            mode='text',
-            textposition='top center',
-            textfont=dict(color=t["text"], size=12, weight='bold'),
-            showlegend=False,
-            hoverinfo='text',
-            customdata=block_summaries,
-            hovertemplate="%{customdata}<extra></extra>"
-        ))
+            # Block-wise Prevalence Chart Logic (Mild + Moderate + Severe over all assessed)
+            block_anemic = block_prev["anemic"]
+            block_prevalence = block_prev["prevalence"]
 
-        block_fig.update_layout(
-            barmode='stack',
-            template=t["plotly"],
-            paper_bgcolor="rgba(0,0,0,0)",
-            plot_bgcolor="rgba(0,0,0,0)",
-            margin=dict(l=20, r=20, t=20, b=20),
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, font=dict(color=t["tick"])),
-            font=dict(family="Outfit, sans-serif", color=t["text"]),
-            hoverlabel=dict(bgcolor=t["hover_bg"], font_size=13, font_family="var(--font-family)", font_color=t["hover_text"], bordercolor="rgba(99, 102, 241, 0.2)"),
-            xaxis=dict(showgrid=False, tickfont=dict(color=t["tick"])),
-            yaxis=dict(showgrid=True, gridcolor=t["grid"], tickfont=dict(color=t["tick"]))
-        )
+            # Create Custom Data for Tooltip
+            prev_summaries = []
+            for block in block_prevalence.index:
+                b_total = block_totals.loc[block]
+                anemic = block_anemic.loc[block]
+                prev = block_prevalence.loc[block]
+            
+                summary = f"<span style='font-size:16px;'><b>{block}</b></span><br>"
+                summary += f"Prevalence: <b>{prev:.2f}%</b><br>"
+                summary += f"Anemic Cases: <b>{int(anemic)}</b><br>"
+                summary += f"Total Assessed: <b>{int(b_total)}</b>"
+                prev_summaries.append(summary)
+
+            block_prev_fig = go.Figure(layout=dict(
+                paper_bgcolor="rgba(0,0,0,0)",
+                plot_bgcolor="rgba(0,0,0,0)",
+                margin=dict(l=20, r=20, t=20, b=20),
+                font=dict(family="Outfit, sans-serif", color=t.text),
+                hoverlabel=dict(bgcolor=t.hover_bg, font_size=13, font_family="var(--font-family)", font_color=t.hover_text, bordercolor="rgba(99, 102, 241, 0.2)"),
+                xaxis=dict(showgrid=False, tickfont=dict(color=t.tick)),
+                yaxis=dict(showgrid=True, gridcolor=t.grid, tickfont=dict(color=t.tick), range=[0, 100], title="Prevalence (%)")
+            ))
 
-        # Block-wise Prevalence Chart Logic
-        # Calculate Anemic Count (Mild + Moderate + Severe)
-        anemic_cols = [c for c in ["mild", "moderate", "severe"] if c in block_anemia_counts.columns]
-        if anemic_cols:
-            block_anemic = block_anemia_counts[anemic_cols].sum(axis=1)
+            # Add Bar Trace
+            block_prev_fig.add_trace(go.Bar(
+                x=block_prevalence.index,
+                y=block_prevalence.values,
+                text=[f"{v:.2f}%" for v in block_prevalence.values],
+                textposition='auto',
+                name="Prevalence",
+                marker_color="#8b5cf6", # Violet for prevalence
+                customdata=prev_summaries,
+                hovertemplate="%{customdata}<extra></extra>"
+            ))
         else:
-            block_anemic = pd.Series(0, index=block_anemia_counts.index)
-
-        # Calculate Percentage
-        # Handle division by zero
-        block_prevalence = (block_anemic / block_totals * 100).fillna(0).round(2)
+            block_fig = go.Figure()
+            block_prev_fig = go.Figure()
+    else:
+        block_fig = block_prev_fig = no_update
 
-        # Create Custom Data for Tooltip
-        prev_summaries = []
-        for block in block_prevalence.index:
-            b_total = block_totals.loc[block]
-            anemic = block_anemic.loc[block]
-            prev = block_prevalence.loc[block]
-            
-            summary = f"<span style='font-size:16px;'><b>{block}</b></span><br>"
-            summary += f"Prevalence: <b>{prev:.2f}%</b><br>"
-            summary += f"Anemic Cases: <b>{int(anemic)}</b><br>"
-            summary += f"Total Assessed: <b>{int(b_total)}</b>"
-            prev_summaries.append(summary)
-
-        # Add Bar Trace
-        block_prev_fig.add_trace(go.Bar(
-            x=block_prevalence.index,
-            y=block_prevalence.values,
-            text=[f"{v:.2f}%" for v in block_prevalence.values],
-            textposition='auto',
-            name="Prevalence",
-            marker_color="#8b5cf6", # Violet for prevalence
-            customdata=prev_summaries,
-            hovertemplate="%{customdata}<extra></extra>"
-        ))
+    logger.debug("FINAL RETURN -> Total: %s, Prev: %s, Normal: %s", total, prevalence_str, normal_kpi)
+    logger.debug("anemia_opts: %s... (len: %d)", anemia_opts[:2], len(anemia_opts))
+    
+    # Tables that are only hidden placeholders on this page get no rows: the records table
+    # on Treat, the urgent list and the Treat tables everywhere else
+    if pathname == "/treat":
+        table_data = table_cols = no_update
+    else:
+        table_data = df_table.to_dict("records")
+        urgent_list = severe_data = moderate_data = mild_data = treat_cols = no_update
 
-        block_prev_fig.update_layout(
-            template=t["plotly"],
-            paper_bgcolor="rgba(0,0,0,0)",
-            plot_bgcolor="rgba(0,0,0,0)",
-            margin=dict(l=20, r=20, t=20, b=20),
-            font=dict(family="Outfit, sans-serif", color=t["text"]),
-            hoverlabel=dict(bgcolor=t["hover_bg"], font_size=13, font_family="var(--font-family)", font_color=t["hover_text"], bordercolor="rgba(99, 102, 241, 0.2)"),
-            xaxis=dict(showgrid=False, tickfont=dict(color=t["tick"])),
-            yaxis=dict(showgrid=True, gridcolor=t["grid"], tickfont=dict(color=t["tick"]), range=[0, 100], title="Prevalence (%)")
-        )
+    # Overview charts were built without a template; attach the theme's shared one
+    benif_bar, anemia_pie, anemia_village_bar, hgb_stats_fig, bmi_fig, block_fig, block_prev_fig = (
+        themed_figure_json(fig, theme) if isinstance(fig, go.Figure) else fig
+        for fig in (benif_bar, anemia_pie, anemia_village_bar, hgb_stats_fig, bmi_fig, block_fig, block_prev_fig)
+    )
 
-    print(f"DEBUG: FINAL RETURN -> Total: {total}, Prev: {prevalence_str}, Normal: {normal_kpi}")
-    print(f"DEBUG: anemia_opts: {anemia_opts[:2]}... (len: {len(anemia_opts)})")
-    
-    return (total, normal_kpi, moderate_kpi, severe_kpi, mild_kpi, avg_hgb, diet_yes, prevalence_str, map_fig, benif_bar, anemia_pie, anemia_village_bar, hgb_stats_fig, bmi_fig, block_fig, block_prev_fig, df_table.to_dict("records"), table_cols, block_opts, loc_opts, benif_opts, anemia_opts, block_code, location, Beneficiary, anemia, urgent_list, severe_data, treat_cols, moderate_data, treat_cols, mild_data, treat_cols, weekly_summary_content)
+    result = (total, normal_kpi, moderate_kpi, severe_kpi, mild_kpi, avg_hgb, diet_yes, prevalence_str, map_fig, benif_bar, anemia_pie, anemia_village_bar, hgb_stats_fig, bmi_fig, block_fig, block_prev_fig, table_data, table_cols, block_opts, loc_opts, benif_opts, anemia_opts, block_code, location, Beneficiary, anemia, urgent_list, severe_data, treat_cols, moderate_data, treat_cols, mild_data, treat_cols, weekly_summary_content)
+    # Figures go out (and into the cache) as plain plotly JSON dicts, which Dash accepts as-is
+    result = tuple(v.to_plotly_json() if isinstance(v, go.Figure) else v for v in result)
+    if cache_key is not None:
+        _DASHBOARD_CACHE.put(cache_key, result)
+    return result
 
 
 # =========================
@@ -2947,7 +3717,7 @@ def update_asha_notification_status(n_clicks, stored_dict):
 
     print(f"DEBUG: NOTIFY TRIGGERED for {asha_clicked}. n_clicks={triggered_value}")
     
-    df = pd.DataFrame(stored_dict["records"])
+    df = stored_records_frame(stored_dict)
     
     # Filter for this Asha
     # Handle "Asha Details Missing"
@@ -2959,7 +3729,7 @@ def update_asha_notification_status(n_clicks, stored_dict):
     else:
         mask_asha = df["Asha_Worker"] == asha_clicked
         
-    mask_anemia = df["anemia_category"].str.lower().isin(["mild", "moderate", "severe"])
+    mask_anemia = anemia_category_in(df["anemia_category"], ["mild", "moderate", "severe"])
     
     target_rows = df[mask_asha & mask_anemia]
     
@@ -3084,7 +3854,7 @@ def handle_table_actions(severe_cell, moderate_cell, mild_cell, severe_data, mod
 
 @app.callback(
     Output("download-data", "data"),
-    [Input("btn-excel", "n_clicks"), Input("btn-csv", "n_clicks")],
+    [Input("btn-excel", "n_clicks", allow_optional=True), Input("btn-csv", "n_clicks", allow_optional=True)],
     [State("stored-data", "data"), State("block-code-dropdown", "value"), State("location-dropdown", "value"),
      State("Beneficiary-dropdown", "value"), State("anemia-dropdown", "value")],
     prevent_initial_call=True
@@ -3103,10 +3873,10 @@ def export_data(n_excel, n_csv, stored_dict, block_code, location, benif, anemia
         if trigger == "btn-csv" and (n_csv is None or n_csv == 0):
             return no_update
             
-        if not stored_dict or "records" not in stored_dict:
+        if not has_stored_records(stored_dict):
             return no_update
         
-        df = pd.DataFrame(stored_dict["records"])
+        df = stored_records_frame(stored_dict)
         
         # Robust Type Enforcement for Filters
         block_code = [block_code] if isinstance(block_code, str) else (block_code or [])
@@ -3122,8 +3892,7 @@ def export_data(n_excel, n_csv, stored_dict, block_code, location, benif, anemia
         if benif:
             df = df[df["Beneficiary"].isin(benif)]
         if anemia:
-            anemia_lower = [str(x).lower() for x in anemia]
-            df = df[df["anemia_category"].str.lower().isin(anemia_lower)]
+            df = df[anemia_category_in(df["anemia_category"], anemia)]
 
         # ---------------------------------------------------------
         # DPDP COMPLIANCE: MASK PII BEFORE EXPORT
@@ -3191,11 +3960,11 @@ def export_data(n_excel, n_csv, stored_dict, block_code, location, benif, anemia
     prevent_initial_call=True
 )
 def trigger_bulk_notify(n, stored_dict, block_code, location, benif, anemia, current_queue):
-    if n is None or n == 0 or not stored_dict or "records" not in stored_dict:
+    if n is None or n == 0 or not has_stored_records(stored_dict):
         return no_update, False, no_update, no_update, no_update
     
     print(f"DEBUG: Bulk Notify Triggered. n_clicks={n}")
-    df = pd.DataFrame(stored_dict["records"])
+    df = stored_records_frame(stored_dict)
     
     current_queue = current_queue or []
     print(f"DEBUG: DF columns available: {df.columns.tolist()}")
@@ -3220,11 +3989,10 @@ def trigger_bulk_notify(n, stored_dict, block_code, location, benif, anemia, cur
     
     # Filter for anemia - default to Moderate/Severe if no filter
     if anemia:
-        anemia_lower = [str(x).lower() for x in anemia]
-        df = df[df["anemia_category"].str.lower().isin(anemia_lower)]
+        df = df[anemia_category_in(df["anemia_category"], anemia)]
     else:
         # Default to all anemic categories for notifications
-        df = df[df["anemia_category"].str.lower().isin(["mild", "moderate", "severe"])]
+        df = df[anemia_category_in(df["anemia_category"], ["mild", "moderate", "severe"])]
 
     print(f"DEBUG: Filtered records count: {len(df)}")
 
@@ -3307,7 +4075,7 @@ def render_notification_queue(queue):
     ], className="d-flex justify-content-between align-items-center mb-3"))
 
     for item in queue:
-        encoded_msg = urllib.parse.quote(item["msg"])
+        encoded_msg = quote_message(item["msg"])
         wa_link = f"https://wa.me/{item['contact']}?text={encoded_msg}"
         
         card = dbc.Card([
@@ -3388,6 +4156,21 @@ app.clientside_callback(
     Input("bulk-notification-urls", "data")
 )
 
+# Clientside cross-filtering: chart clicks only rewrite dropdown values, which then
+# trigger update_dashboard through the dropdown inputs
+app.clientside_callback(
+    ClientsideFunction(namespace="clientside", function_name="cross_filter_click"),
+    Output("location-dropdown", "value", allow_duplicate=True),
+    Output("anemia-dropdown", "value", allow_duplicate=True),
+    Output("Beneficiary-dropdown", "value", allow_duplicate=True),
+    Input("map", "clickData"),
+    Input("anemia-pie", "clickData"),
+    Input("Beneficiary-bar", "clickData"),
+    State("location-dropdown", "value"),
+    State("location-dropdown", "options"),
+    prevent_initial_call=True
+)
+
 # Clientside mobile menu toggle
 app.clientside_callback(
     ClientsideFunction(namespace="clientside", function_name="toggle_mobile_menu"),
@@ -61,6 +61,43 @@ window.dash_clientside = Object.assign({}, window.dash_clientside, {
             return window.dash_clientside.no_update;
         },
 
+        cross_filter_click: function (map_click, pie_click, bar_click, location, loc_options) {
+            const no_update = window.dash_clientside.no_update;
+            const ctx = window.dash_clientside.callback_context;
+            if (!ctx.triggered || !ctx.triggered.length) return [no_update, no_update, no_update];
+            const source = ctx.triggered[0].prop_id.split('.')[0];
+            const point = (click) => (click && click.points && click.points.length) ? click.points[0] : null;
+
+            if (source === 'map') {
+                const p = point(map_click);
+                const village = p ? p.text : null;
+                if (!village) return [no_update, no_update, no_update];
+                // Location values are "<PSU Name> (<Area Code>)", or the bare PSU name when no code exists
+                const prefix = village + ' (';
+                const match = (loc_options || []).map((o) => o.value).find((v) =>
+                    v === village || (v.startsWith(prefix) && v.indexOf('(', prefix.length) === -1));
+                if (!match) return [no_update, no_update, no_update];
+                const current = Array.isArray(location) ? location : (location ? [location] : []);
+                if (current.includes(match)) return [no_update, no_update, no_update];
+                console.log(">>> Map click | Location:", match);
+                return [[match], no_update, no_update];
+            }
+
+            if (source === 'anemia-pie') {
+                const p = point(pie_click);
+                if (!p || !p.label) return [no_update, no_update, no_update];
+                return [no_update, [String(p.label).toLowerCase()], no_update];
+            }
+
+            if (source === 'Beneficiary-bar') {
+                const p = point(bar_click);
+                if (!p || !p.x) return [no_update, no_update, no_update];
+                return [no_update, no_update, [p.x]];
+            }
+
+            return [no_update, no_update, no_update];
+        },
+
         null_handler: function (url_list) {
             return null;
         }
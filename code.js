@@ -10,9 +10,21 @@
  * 6. Copy the URL and paste it into app.py as EXCEL_WRITE_URL.
  */
 
+/**
+ * Reads the JSON batch sent by the dashboard. With SYNC_GZIP=1 the server sends
+ * base64(gzip(JSON)) as application/x-gzip to cut upload size.
+ */
+function parsePayload(e) {
+    if (e.postData.type === "application/x-gzip") {
+        var blob = Utilities.newBlob(Utilities.base64Decode(e.postData.contents), "application/x-gzip");
+        return JSON.parse(Utilities.ungzip(blob).getDataAsString());
+    }
+    return JSON.parse(e.postData.contents);
+}
+
 function doPost(e) {
     try {
-        var data = JSON.parse(e.postData.contents);
+        var data = parsePayload(e);
         var ss = SpreadsheetApp.getActiveSpreadsheet();
         var sheet = ss.getSheetByName("Dashboard_Sync") || ss.insertSheet("Dashboard_Sync");
 
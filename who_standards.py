@@ -1,4 +1,6 @@
-﻿WHO_BMI_LMS = {
+﻿import numpy as np
+
+WHO_BMI_LMS = {
     'boys': {
         0: {'L': -0.3053, 'M': 13.4069, 'S': 0.0956},
         1: {'L': 0.2708, 'M': 14.9441, 'S': 0.09027},
@@ -580,3 +582,58 @@ def classify_who_z_score(z_score, age_in_months):
             return "Underweight"
         else:
             return "Normal"
+
+
+# LMS lookup tables for the vectorized path, shape (2, months): row 0 = boys, row 1 = girls.
+# Table keys are contiguous whole months 0..228, so a direct gather at floor(age) plus
+# linear interpolation reproduces get_lms (including clamping below 0 and above 228 months).
+_LMS_SEXES = ('boys', 'girls')
+_LMS_L, _LMS_M, _LMS_S = (
+    np.array([[WHO_BMI_LMS[g][k][p] for k in sorted(WHO_BMI_LMS[g])] for g in _LMS_SEXES], dtype=float)
+    for p in ('L', 'M', 'S')
+)
+_LMS_LAST_MONTH = _LMS_L.shape[1] - 1
+
+def calculate_bmi_z_score_vec(bmi, gender, age_in_months):
+    """
+    Vectorized calculate_bmi_z_score over whole columns.
+    gender is an array of 'boys'/'girls' (anything else uses the 'girls' table, as in get_lms).
+    Returns a float array; rows with missing BMI or age come back as NaN.
+    """
+    bmi = np.asarray(bmi, dtype=float)
+    age = np.asarray(age_in_months, dtype=float)
+    gender = np.char.lower(np.asarray(gender, dtype=str))
+
+    # One gather per table: sex row, lower month column, and the fraction towards the next month
+    sex = np.where(gender == 'boys', 0, 1)
+    months = np.clip(np.nan_to_num(age), 0, _LMS_LAST_MONTH)
+    lower = np.minimum(months.astype(np.intp), _LMS_LAST_MONTH - 1)
+    fraction = months - lower
+    L, M, S = (
+        table[sex, lower] + fraction * (table[sex, lower + 1] - table[sex, lower])
+        for table in (_LMS_L, _LMS_M, _LMS_S)
+    )
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = bmi / M
+        safe_L = np.where(L == 0, 1.0, L)
+        z = np.where(L == 0, np.log(ratio) / S, (ratio ** safe_L - 1) / (safe_L * S))
+    z[np.isnan(age)] = np.nan
+    return z
+
+def classify_who_z_score_vec(z_score, age_in_months):
+    """Vectorized classify_who_z_score; NaN Z-scores map to "Missing"."""
+    z = np.asarray(z_score, dtype=float)
+    under_5 = np.asarray(age_in_months, dtype=float) <= 60
+    conditions = [
+        np.isnan(z),
+        under_5 & (z > 3),
+        under_5 & (z > 2),
+        under_5 & (z > 1),
+        ~under_5 & (z > 2),
+        ~under_5 & (z > 1),
+        z < -3,
+        z < -2,
+    ]
+    choices = ["Missing", "Obese", "Overweight", "Risk of Overweight", "Obese", "Overweight", "Severe Underweight", "Underweight"]
+    return np.select(conditions, choices, default="Normal")